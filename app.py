@@ -10,6 +10,9 @@ import boto3
 from io import StringIO
 import json
 from components.sidebar import Filter
+from tabs.date_utils import ISO_DATE_FORMAT, parse_date_series
+from tabs.excel_reader import read_excel
+from tabs.edit_journal import EditJournal
 import os
 from dotenv import load_dotenv
 from botocore.exceptions import ClientError
@@ -20,7 +23,7 @@ def read_file(uploaded_file):
     if uploaded_file.name.endswith('.csv'):
         return pd.read_csv(uploaded_file)
     elif uploaded_file.name.endswith('.xlsx'):
-        return pd.read_excel(uploaded_file)
+        return read_excel(uploaded_file)
     else:
         st.error("Unsupported file format")
         return None
@@ -45,8 +48,11 @@ try:
 except ClientError:
     df = pd.DataFrame()
 
+# Overlay category changes saved since the edited dataset was last written
+df = EditJournal().apply(df)
+
 if "Transaction_Date" in df.columns:
-    df["Transaction_Date"] = pd.to_datetime(df["Transaction_Date"], format='mixed').dt.date
+    df["Transaction_Date"] = parse_date_series(df["Transaction_Date"], ISO_DATE_FORMAT).dt.date
 
 if df.empty:
     filtered_df = pd.DataFrame()
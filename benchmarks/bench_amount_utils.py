@@ -0,0 +1,73 @@
+"""
+Micro-benchmark for `normalize_amount_series` against the previous
+implementation that ran the regex replacements over every row.
+
+Run from the repository root:
+    python -m benchmarks.bench_amount_utils
+"""
+import timeit
+
+import numpy as np
+import pandas as pd
+
+from tabs.amount_utils import normalize_amount_series
+
+ROWS = 200_000
+REPEAT = 5
+
+
+def legacy_normalize_amount_series(series: pd.Series) -> pd.Series:
+    if pd.api.types.is_numeric_dtype(series):
+        return pd.to_numeric(series, errors="coerce")
+
+    cleaned = series.astype("string").str.strip()
+    cleaned = cleaned.replace(
+        {
+            r"^\((.*)\)$": r"-\1",
+            r"[\$,]": "",
+            r"^\s*$": pd.NA,
+        },
+        regex=True,
+    )
+    return pd.to_numeric(cleaned, errors="coerce")
+
+
+def build_sample(rows: int = ROWS) -> pd.Series:
+    rng = np.random.default_rng(0)
+    amounts = rng.choice(np.round(rng.gamma(2.0, 40.0, size=3_000), 2), size=rows)
+    formats = rng.integers(0, 4, size=rows)
+    values = np.where(
+        formats == 0,
+        [f"${value:,.2f}" for value in amounts],
+        np.where(
+            formats == 1,
+            [f"({value:,.2f})" for value in amounts],
+            np.where(formats == 2, [f"{value:.2f}" for value in amounts], ""),
+        ),
+    )
+    return pd.Series(values, dtype=object)
+
+
+def main() -> None:
+    sample = build_sample()
+    numeric_sample = legacy_normalize_amount_series(sample)
+
+    expected = legacy_normalize_amount_series(sample).astype("float64")
+    actual = normalize_amount_series(sample)
+    pd.testing.assert_series_equal(actual, expected, check_names=False)
+
+    cases = {
+        "legacy / strings": lambda: legacy_normalize_amount_series(sample),
+        "fast / strings": lambda: normalize_amount_series(sample),
+        "fast / strings -> cents": lambda: normalize_amount_series(sample, as_cents=True),
+        "legacy / numeric": lambda: legacy_normalize_amount_series(numeric_sample),
+        "fast / numeric": lambda: normalize_amount_series(numeric_sample),
+    }
+    print(f"{ROWS:,} rows, best of {REPEAT}")
+    for label, func in cases.items():
+        best = min(timeit.repeat(func, number=1, repeat=REPEAT))
+        print(f"{label:<26} {best * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+from typing import Sequence
+
+import numpy as np
+import pandas as pd
+
+SCENARIO_COLUMNS = [
+    "Price",
+    "Down_Payment_Pct",
+    "Down_Payment",
+    "Rate",
+    "Term_Years",
+    "Monthly_Payment",
+    "Total_Interest",
+    "Affordability_Ratio",
+    "Break_Even_Months",
+]
+
+
+def amortized_payments(principal, annual_rate, term_years) -> np.ndarray:
+    """
+    Return the level monthly payment for every broadcast combination of the inputs.
+
+    Zero-rate loans are repaid in equal instalments and non-positive principals
+    cost nothing, matching the scalar calculation used by the forecast tab.
+    """
+    principal = np.asarray(principal, dtype=np.float64)
+    monthly_rate = np.asarray(annual_rate, dtype=np.float64) / 100 / 12
+    months = np.maximum((np.asarray(term_years, dtype=np.float64) * 12).astype(np.int64), 1)
+
+    factor = (1 + monthly_rate) ** months
+    with np.errstate(divide="ignore", invalid="ignore"):
+        amortized = principal * monthly_rate * factor / (factor - 1)
+    payments = np.where(monthly_rate == 0, principal / months, amortized)
+    return np.where(principal > 0, payments, 0.0)
+
+
+def scenario_grid(
+    prices: Sequence[float],
+    down_payment_pcts: Sequence[float],
+    rates: Sequence[float],
+    terms: Sequence[float],
+    avg_net_savings: float,
+    extra_monthly_cost: float = 0.0,
+) -> pd.DataFrame:
+    """
+    Evaluate every price x down payment x rate x term scenario in one broadcast.
+
+    Parameters:
+    prices (sequence): Purchase prices.
+    down_payment_pcts (sequence): Down payments as a percentage of the price.
+    rates (sequence): Annual interest rates in percent.
+    terms (sequence): Loan terms in years.
+    avg_net_savings (float): Average monthly net savings used for the ratios.
+    extra_monthly_cost (float): Recurring costs on top of the loan payment (insurance, upkeep).
+
+    Returns:
+    pd.DataFrame: One row per scenario with payment, total interest, affordability
+    ratio (monthly cost / net savings) and months of savings to rebuild the down payment.
+    """
+    price = np.asarray(prices, dtype=np.float64)[:, None, None, None]
+    down_pct = np.asarray(down_payment_pcts, dtype=np.float64)[None, :, None, None]
+    rate = np.asarray(rates, dtype=np.float64)[None, None, :, None]
+    term = np.asarray(terms, dtype=np.float64)[None, None, None, :]
+
+    down_payment = price * down_pct / 100
+    principal = np.maximum(price - down_payment, 0)
+    payment = amortized_payments(principal, rate, term)
+    months = np.maximum((term * 12).astype(np.int64), 1)
+    total_interest = payment * months - principal
+
+    if avg_net_savings > 0:
+        ratio = (payment + extra_monthly_cost) / avg_net_savings
+        break_even = np.where(down_payment > 0, down_payment / avg_net_savings, np.nan)
+    else:
+        ratio = np.full(payment.shape, np.inf)
+        break_even = np.full(payment.shape, np.nan)
+
+    shape = np.broadcast_shapes(price.shape, down_pct.shape, rate.shape, term.shape)
+    columns = [price, down_pct, down_payment, rate, term, payment, total_interest, ratio, break_even]
+    return pd.DataFrame(
+        {
+            name: np.broadcast_to(values, shape).ravel()
+            for name, values in zip(SCENARIO_COLUMNS, columns)
+        }
+    )
+
+
+def amortization_schedule(principal: float, annual_rate: float, term_years: float) -> pd.DataFrame:
+    """Return the month-by-month split of each payment into principal and interest."""
+    months = max(int(term_years * 12), 1)
+    payment = float(amortized_payments(principal, annual_rate, term_years))
+    monthly_rate = annual_rate / 100 / 12
+    periods = np.arange(1, months + 1)
+
+    if principal <= 0:
+        balance = np.zeros(months)
+    elif monthly_rate == 0:
+        balance = principal - payment * periods
+    else:
+        growth = (1 + monthly_rate) ** periods
+        balance = principal * growth - payment * (growth - 1) / monthly_rate
+    balance = np.maximum(balance, 0.0)
+    opening_balance = np.concatenate(([max(principal, 0.0)], balance[:-1]))
+    interest = opening_balance * monthly_rate
+    return pd.DataFrame(
+        {
+            "Month": periods,
+            "Payment": payment,
+            "Principal": payment - interest,
+            "Interest": interest,
+            "Balance": balance,
+        }
+    )
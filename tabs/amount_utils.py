@@ -1,12 +1,10 @@
+import numpy as np
 import pandas as pd
 
 
-def normalize_amount_series(series: pd.Series) -> pd.Series:
-    """Convert mixed-format currency values into numeric floats."""
-    if pd.api.types.is_numeric_dtype(series):
-        return pd.to_numeric(series, errors="coerce")
-
-    cleaned = series.astype("string").str.strip()
+def _clean_currency_strings(values: pd.Series) -> pd.Series:
+    """Parse currency strings such as `$1,234.50` or `(12.00)` into floats."""
+    cleaned = values.astype("string").str.strip()
     cleaned = cleaned.replace(
         {
             r"^\((.*)\)$": r"-\1",
@@ -16,3 +14,37 @@ def normalize_amount_series(series: pd.Series) -> pd.Series:
         regex=True,
     )
     return pd.to_numeric(cleaned, errors="coerce")
+
+
+def normalize_amount_series(series: pd.Series, as_cents: bool = False) -> pd.Series:
+    """
+    Convert mixed-format currency values into numeric floats.
+
+    Already-numeric columns are returned without any string work. Otherwise only
+    the distinct values are parsed and mapped back onto the rows, since statement
+    amounts repeat heavily. With `as_cents=True` the result is a nullable integer
+    count of cents, which needs no further rounding.
+    """
+    if pd.api.types.is_numeric_dtype(series):
+        amounts = pd.to_numeric(series, errors="coerce")
+    else:
+        codes, uniques = pd.factorize(series, use_na_sentinel=True)
+        parsed = _clean_currency_strings(pd.Series(uniques, dtype=object))
+        # Append NaN so the -1 sentinel used for missing values maps to NaN.
+        lookup = np.append(parsed.to_numpy(dtype="float64", na_value=np.nan), np.nan)
+        amounts = pd.Series(lookup[codes], index=series.index, name=series.name)
+
+    if as_cents:
+        return amounts_to_cents(amounts)
+    return amounts
+
+
+def amounts_to_cents(amounts: pd.Series) -> pd.Series:
+    """Convert float amounts into nullable integer cents."""
+    cents = np.round(amounts.astype("float64") * 100)
+    return pd.Series(cents, index=amounts.index, name=amounts.name).astype("Int64")
+
+
+def cents_to_amounts(cents: pd.Series) -> pd.Series:
+    """Convert integer cents back into float amounts."""
+    return cents.astype("Float64").astype("float64") / 100
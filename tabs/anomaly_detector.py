@@ -0,0 +1,246 @@
+import json
+import os
+from datetime import datetime
+from io import BytesIO
+
+import boto3
+import numpy as np
+import pandas as pd
+from botocore.exceptions import ClientError
+from dotenv import load_dotenv
+
+from tabs.amount_utils import normalize_amount_series
+from tabs.cache_utils import LRUCache
+from tabs.transaction_fingerprint import TRANSACTION_ID_COLUMN, canonical_merchant
+
+load_dotenv()
+
+config = json.load(open("assets/config.json"))
+
+s3 = boto3.client(
+    "s3",
+    aws_access_key_id=os.environ["AWS_ACCESS_KEY_ID"],
+    aws_secret_access_key=os.environ["AWS_SECRET_ACCESS_KEY"],
+)
+
+bucket_name = config["S3_BUCKET_NAME"]
+ANOMALY_STATE_PATH = config["ANOMALY_STATE_PATH"]
+ANOMALY_FLAGS_PATH = config["ANOMALY_FLAGS_PATH"]
+ANOMALY_Z_THRESHOLD = config["ANOMALY_Z_THRESHOLD"]
+ANOMALY_MIN_HISTORY = config["ANOMALY_MIN_HISTORY"]
+EXCLUDED_CATEGORIES = config["EXCLUDED_CATEGORIES"]
+
+# Merchant statistics are preferred; category statistics cover new merchants.
+SCOPES = ["Merchant", "Category"]
+STATE_COLUMNS = ["Scope", "Key", "Count", "Mean", "M2"]
+FLAG_COLUMNS = [
+    TRANSACTION_ID_COLUMN,
+    "Anomaly_Score",
+    "Anomaly_Scope",
+    "Expected_Amount",
+    "Flagged_At",
+]
+
+_flags_cache = LRUCache(maxsize=4)
+
+
+def batch_statistics(keys: pd.Series, values: pd.Series) -> pd.DataFrame:
+    """Return count, mean and sum of squared deviations of `values` per key."""
+    grouped = values.groupby(keys, sort=False)
+    counts = grouped.count()
+    stats = pd.DataFrame({"Count": counts, "Mean": grouped.mean()})
+    stats["M2"] = grouped.var(ddof=0).fillna(0.0) * counts
+    return stats
+
+
+def combine_statistics(state: pd.DataFrame, batch: pd.DataFrame) -> pd.DataFrame:
+    """
+    Merge running statistics with a batch using Chan et al.'s parallel update.
+
+    Both frames are indexed by key with Count, Mean and M2 columns; the result is
+    what a single pass over both sets of observations would have produced.
+    """
+    if state.empty:
+        return batch.copy()
+    if batch.empty:
+        return state
+
+    keys = state.index.union(batch.index)
+    left = state.reindex(keys).fillna(0.0)
+    right = batch.reindex(keys).fillna(0.0)
+    count = left["Count"] + right["Count"]
+    delta = right["Mean"] - left["Mean"]
+    right_share = right["Count"] / count
+    return pd.DataFrame(
+        {
+            "Count": count,
+            "Mean": left["Mean"] + delta * right_share,
+            "M2": left["M2"] + right["M2"] + delta ** 2 * left["Count"] * right_share,
+        }
+    )
+
+
+class AnomalyDetector:
+    """
+    Streaming detector for unusually large spend.
+
+    Running mean/variance of log spend is kept per merchant and per category
+    and persisted to S3. New transactions are scored against the stored state
+    before being folded into it, so scoring an import touches only its rows.
+    """
+
+    def __init__(self, state_path=ANOMALY_STATE_PATH, flags_path=ANOMALY_FLAGS_PATH):
+        self.state_path = state_path
+        self.flags_path = flags_path
+
+    def _read_csv(self, key):
+        try:
+            obj = s3.get_object(Bucket=bucket_name, Key=key)
+        except ClientError:
+            return pd.DataFrame()
+        return pd.read_csv(BytesIO(obj["Body"].read()))
+
+    def _write_csv(self, df, key):
+        s3.put_object(Bucket=bucket_name, Key=key, Body=df.to_csv(index=False))
+
+    def _spend_rows(self, df):
+        """Return the outflows worth scoring with their merchant, category and log amount."""
+        if df.empty:
+            return pd.DataFrame(
+                columns=[TRANSACTION_ID_COLUMN, "Transaction_Date", "Merchant", "Category", "Value"]
+            )
+        amounts = normalize_amount_series(df["Amount"])
+        spend_mask = (amounts < 0) & ~df["Category"].isin(EXCLUDED_CATEGORIES)
+        spend = df.loc[spend_mask]
+        return pd.DataFrame(
+            {
+                TRANSACTION_ID_COLUMN: spend[TRANSACTION_ID_COLUMN].to_numpy(),
+                "Transaction_Date": spend["Transaction_Date"].to_numpy(),
+                "Merchant": canonical_merchant(spend["Description"]).to_numpy(),
+                "Category": spend["Category"].fillna("Uncategorized").astype(str).to_numpy(),
+                "Value": np.log1p(-amounts[spend_mask].to_numpy()),
+            }
+        )
+
+    def load_state(self):
+        """Return the running statistics per scope, indexed by key."""
+        stored = self._read_csv(self.state_path)
+        state = {}
+        for scope in SCOPES:
+            if stored.empty:
+                state[scope] = pd.DataFrame(columns=["Count", "Mean", "M2"], dtype="float64")
+            else:
+                scoped = stored[stored["Scope"] == scope]
+                state[scope] = scoped.set_index(pd.Index(scoped["Key"].astype(str)))[["Count", "Mean", "M2"]]
+        return state
+
+    def save_state(self, state):
+        frames = [
+            stats.rename_axis("Key").reset_index().assign(Scope=scope)
+            for scope, stats in state.items()
+        ]
+        self._write_csv(pd.concat(frames, ignore_index=True)[STATE_COLUMNS], self.state_path)
+
+    def load_flags(self):
+        """Return persisted flags, cached by the flags object's ETag."""
+        try:
+            version = s3.head_object(Bucket=bucket_name, Key=self.flags_path)["ETag"]
+        except ClientError:
+            return pd.DataFrame(columns=FLAG_COLUMNS)
+        flags = _flags_cache.get(version)
+        if flags is None:
+            flags = _flags_cache.put(version, self._read_csv(self.flags_path))
+        return flags
+
+    def score(self, rows, state):
+        """
+        Score spend rows against the running statistics.
+
+        Returns:
+            pd.DataFrame: Rows whose log spend exceeds the expected level by at least
+            ANOMALY_Z_THRESHOLD standard deviations, in FLAG_COLUMNS layout.
+        """
+        scores = pd.Series(np.nan, index=rows.index)
+        expected = pd.Series(np.nan, index=rows.index)
+        scopes = pd.Series(None, index=rows.index, dtype="object")
+
+        for scope in SCOPES:
+            stats = state[scope].reindex(rows[scope].to_numpy())
+            counts = stats["Count"].to_numpy(dtype="float64")
+            with np.errstate(divide="ignore", invalid="ignore"):
+                std = np.sqrt(stats["M2"].to_numpy(dtype="float64") / (counts - 1))
+                z = (rows["Value"].to_numpy() - stats["Mean"].to_numpy(dtype="float64")) / std
+            usable = (counts >= ANOMALY_MIN_HISTORY) & (std > 0) & scores.isna().to_numpy()
+            scores[usable] = z[usable]
+            expected[usable] = np.expm1(stats["Mean"].to_numpy()[usable])
+            scopes[usable] = scope
+
+        flagged = scores >= ANOMALY_Z_THRESHOLD
+        return pd.DataFrame(
+            {
+                TRANSACTION_ID_COLUMN: rows.loc[flagged, TRANSACTION_ID_COLUMN].to_numpy(),
+                "Anomaly_Score": scores[flagged].round(2).to_numpy(),
+                "Anomaly_Scope": scopes[flagged].to_numpy(),
+                "Expected_Amount": -expected[flagged].round(2).to_numpy(),
+                "Flagged_At": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            },
+            columns=FLAG_COLUMNS,
+        )
+
+    def update(self, state, rows):
+        """Fold spend rows into the running statistics."""
+        return {
+            scope: combine_statistics(state[scope], batch_statistics(rows[scope], rows["Value"]))
+            for scope in SCOPES
+        }
+
+    def score_new_transactions(self, new_df):
+        """
+        Score newly consolidated transactions and fold them into the stored state.
+
+        Only the new rows are read and scored; history is represented by the stored
+        running statistics. New flags are appended to the persisted flags.
+
+        Returns:
+            pd.DataFrame: The flags raised for `new_df`.
+        """
+        rows = self._spend_rows(new_df)
+        if rows.empty:
+            return pd.DataFrame(columns=FLAG_COLUMNS)
+
+        state = self.load_state()
+        flags = self.score(rows, state)
+        self.save_state(self.update(state, rows))
+
+        if not flags.empty:
+            all_flags = pd.concat([self.load_flags(), flags], ignore_index=True)
+            all_flags = all_flags.drop_duplicates(subset=[TRANSACTION_ID_COLUMN], keep="last")
+            self._write_csv(all_flags, self.flags_path)
+        return flags
+
+    def rebuild(self, df):
+        """
+        Replay the full history month by month from an empty state.
+
+        Each month is scored against the statistics of the months before it, which
+        is what incremental imports would have produced.
+
+        Returns:
+            pd.DataFrame: All flags raised over the history.
+        """
+        rows = self._spend_rows(df)
+        state = {scope: pd.DataFrame(columns=["Count", "Mean", "M2"], dtype="float64") for scope in SCOPES}
+        flags = [pd.DataFrame(columns=FLAG_COLUMNS)]
+
+        if not rows.empty:
+            months = pd.to_datetime(
+                rows["Transaction_Date"], format="mixed", errors="coerce"
+            ).dt.to_period("M")
+            for _, month_rows in rows.groupby(months, sort=True):
+                flags.append(self.score(month_rows, state))
+                state = self.update(state, month_rows)
+
+        all_flags = pd.concat(flags, ignore_index=True)
+        self.save_state(state)
+        self._write_csv(all_flags, self.flags_path)
+        return all_flags
@@ -0,0 +1,158 @@
+import gzip
+import hashlib
+import json
+import os
+from datetime import datetime
+from io import BytesIO
+
+import boto3
+import pandas as pd
+from dotenv import load_dotenv
+
+from tabs.transaction_fingerprint import TRANSACTION_ID_COLUMN
+
+load_dotenv()
+
+config = json.load(open("assets/config.json"))
+
+s3 = boto3.client(
+    "s3",
+    aws_access_key_id=os.environ["AWS_ACCESS_KEY_ID"],
+    aws_secret_access_key=os.environ["AWS_SECRET_ACCESS_KEY"],
+)
+
+bucket_name = config["S3_BUCKET_NAME"]
+BACKUP_DIR_KEY = config["BACKUP_DIR_KEY"]
+BACKUP_RETENTION = config["BACKUP_RETENTION"]
+UNDATED_PARTITION = "undated"
+
+
+class BackupService:
+    """
+    Incremental, content-addressed snapshots of the edited dataset.
+
+    A snapshot splits the dataset into one chunk per transaction month, stores
+    each chunk gzip-compressed under the SHA-256 of its contents and writes a
+    manifest listing the chunks. Months that did not change between snapshots
+    hash to the same chunk, so only changed months are uploaded.
+    """
+
+    def __init__(self, backup_dir_key=BACKUP_DIR_KEY):
+        self.chunk_prefix = f"{backup_dir_key}chunks/"
+        self.manifest_prefix = f"{backup_dir_key}manifests/"
+
+    def _list_keys(self, prefix):
+        keys = []
+        paginator = s3.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=bucket_name, Prefix=prefix):
+            keys.extend(obj["Key"] for obj in page.get("Contents", []))
+        return keys
+
+    def _delete_keys(self, keys):
+        for start in range(0, len(keys), 1000):
+            s3.delete_objects(
+                Bucket=bucket_name,
+                Delete={"Objects": [{"Key": key} for key in keys[start:start + 1000]]},
+            )
+
+    def _partition_labels(self, df):
+        transaction_dates = pd.to_datetime(df["Transaction_Date"], format="mixed", errors="coerce")
+        return transaction_dates.dt.strftime("%Y-%m").fillna(UNDATED_PARTITION)
+
+    def _serialize_chunk(self, chunk_df):
+        if TRANSACTION_ID_COLUMN in chunk_df.columns:
+            chunk_df = chunk_df.sort_values(TRANSACTION_ID_COLUMN, kind="mergesort")
+        return chunk_df.to_csv(index=False).encode("utf-8")
+
+    def list_snapshots(self):
+        """Return manifest keys, newest first."""
+        return sorted(self._list_keys(self.manifest_prefix), reverse=True)
+
+    def read_manifest(self, manifest_key):
+        obj = s3.get_object(Bucket=bucket_name, Key=manifest_key)
+        return json.loads(obj["Body"].read())
+
+    def create_snapshot(self, df):
+        """
+        Store a snapshot of `df`, uploading only chunks not already stored.
+
+        Returns:
+        dict: The manifest key and the number of uploaded and reused chunks.
+        """
+        existing_chunks = set(self._list_keys(self.chunk_prefix))
+        partitions = self._partition_labels(df)
+        chunks = []
+        uploaded = 0
+
+        for partition, chunk_df in df.groupby(partitions, sort=True):
+            payload = self._serialize_chunk(chunk_df)
+            chunk_key = f"{self.chunk_prefix}{hashlib.sha256(payload).hexdigest()}.csv.gz"
+            if chunk_key not in existing_chunks:
+                s3.put_object(
+                    Bucket=bucket_name,
+                    Key=chunk_key,
+                    Body=gzip.compress(payload, mtime=0),
+                )
+                existing_chunks.add(chunk_key)
+                uploaded += 1
+            chunks.append({"partition": partition, "key": chunk_key, "rows": len(chunk_df)})
+
+        created_at = datetime.now()
+        manifest = {
+            "created_at": created_at.isoformat(timespec="seconds"),
+            "columns": df.columns.tolist(),
+            "row_count": len(df),
+            "chunks": chunks,
+        }
+        body = json.dumps(manifest)
+        # Microseconds keep keys in creation order; the content hash keeps two
+        # snapshots taken at the same instant from overwriting each other.
+        manifest_key = (
+            f"{self.manifest_prefix}{created_at.strftime('%Y%m%d_%H%M%S_%f')}_"
+            f"{hashlib.sha256(body.encode('utf-8')).hexdigest()[:8]}.json"
+        )
+        s3.put_object(Bucket=bucket_name, Key=manifest_key, Body=body)
+        return {
+            "manifest_key": manifest_key,
+            "uploaded_chunks": uploaded,
+            "reused_chunks": len(chunks) - uploaded,
+        }
+
+    def restore_snapshot(self, manifest_key):
+        """Rebuild the dataset stored by a snapshot manifest."""
+        manifest = self.read_manifest(manifest_key)
+        frames = []
+        for chunk in manifest["chunks"]:
+            obj = s3.get_object(Bucket=bucket_name, Key=chunk["key"])
+            frames.append(pd.read_csv(BytesIO(obj["Body"].read()), compression="gzip"))
+
+        if not frames:
+            return pd.DataFrame(columns=manifest["columns"])
+        return pd.concat(frames, ignore_index=True).reindex(columns=manifest["columns"])
+
+    def prune(self, keep=BACKUP_RETENTION):
+        """
+        Delete all but the newest `keep` snapshots and any chunks they no longer reference.
+
+        Returns:
+        tuple: The number of deleted manifests and deleted chunks.
+        """
+        manifests = self.list_snapshots()
+        expired_manifests = manifests[keep:]
+        if not expired_manifests:
+            return 0, 0
+
+        referenced_chunks = set()
+        for manifest_key in manifests[:keep]:
+            referenced_chunks.update(
+                chunk["key"] for chunk in self.read_manifest(manifest_key)["chunks"]
+            )
+        orphaned_chunks = [
+            chunk_key
+            for chunk_key in self._list_keys(self.chunk_prefix)
+            if chunk_key not in referenced_chunks
+        ]
+
+        self._delete_keys(expired_manifests)
+        self._delete_keys(orphaned_chunks)
+        return len(expired_manifests), len(orphaned_chunks)
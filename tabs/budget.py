@@ -6,7 +6,9 @@ import pandas as pd
 import plotly.express as px
 import streamlit as st
 import os
+from botocore.exceptions import ClientError
 from dotenv import load_dotenv
+from tabs.cache_utils import LRUCache, frame_fingerprint
 load_dotenv()
 
 config = json.load(open("assets/config.json"))
@@ -19,6 +21,187 @@ s3 = boto3.client(
 bucket_name = config["S3_BUCKET_NAME"]
 budget_file_key = config["budget_file_key"]
 BUDGET_START_DATE = config["BUDGET_START_DATE"]
+BUDGET_EXCLUDED_CATEGORIES = config["BUDGET_EXCLUDED_CATEGORIES"]
+BUDGET_ACTUALS_COLUMNS = [
+    "Month",
+    "Category",
+    "Amount",
+    "Budgeted_Amount",
+    "Budget_Variance",
+    "Cumulative_Budget_Variance",
+    "Burn_Rate",
+]
+
+_budget_file_cache = LRUCache(maxsize=4)
+YEAR_OVER_YEAR = "YoY"
+BASELINE_WINDOWS = {
+    "Trailing 3 months": 3,
+    "Trailing 6 months": 6,
+    "Trailing 12 months": 12,
+    "Same month last year": YEAR_OVER_YEAR,
+}
+
+_budget_actuals_cache = LRUCache(maxsize=16)
+_monthly_totals_cache = LRUCache(maxsize=8)
+_baseline_cache = LRUCache(maxsize=32)
+
+
+def read_budget_file():
+    """
+    Read the per-month, per-category budget from S3.
+
+    The parsed budget is cached by the object's ETag, so it is only downloaded
+    again after `SetBudget` saves a new version.
+
+    Returns:
+    tuple: The budget DataFrame (empty if none was saved) and its version.
+    """
+    try:
+        version = s3.head_object(Bucket=bucket_name, Key=budget_file_key)["ETag"]
+    except ClientError:
+        return pd.DataFrame(columns=["Month", "Category", "Budgeted Amount"]), None
+
+    budget_df = _budget_file_cache.get(version)
+    if budget_df is None:
+        obj = s3.get_object(Bucket=bucket_name, Key=budget_file_key)
+        budget_df = _budget_file_cache.put(version, pd.read_csv(obj['Body']))
+    return budget_df, version
+
+
+def budget_vs_actuals(expenses, budget_df, budget_version=None):
+    """
+    Align monthly actuals with the per-month, per-category budget.
+
+    Actuals and budgets are pivoted to Month x Category grids, aligned on the
+    union of categories over the months covered by the actuals, and stacked
+    back into a tidy frame. Excluded categories are dropped from both sides.
+
+    Parameters:
+    expenses (pd.DataFrame): Transactions with Transaction_Date, Category and Amount.
+    budget_df (pd.DataFrame): Budget rows with Month, Category and Budgeted Amount.
+    budget_version (str): Identifies `budget_df` for caching, e.g. its ETag.
+
+    Returns:
+    pd.DataFrame: One row per month and category with the actual amount, budgeted amount,
+    variance (actual minus budget), cumulative variance and burn rate (actual / budget).
+    """
+    cache_key = (
+        frame_fingerprint(expenses, ["Transaction_Date", "Category", "Amount"]),
+        budget_version if budget_version is not None else frame_fingerprint(budget_df),
+    )
+    cached = _budget_actuals_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    expenses = expenses[~expenses["Category"].isin(BUDGET_EXCLUDED_CATEGORIES)]
+    if expenses.empty:
+        return pd.DataFrame(columns=BUDGET_ACTUALS_COLUMNS)
+
+    months = pd.to_datetime(expenses["Transaction_Date"], format="mixed").dt.to_period("M").dt.start_time
+    actuals = (
+        expenses.groupby([months.rename("Month"), expenses["Category"]])["Amount"]
+        .sum()
+        .abs()
+        .unstack("Category")
+    )
+
+    budget_df = budget_df[~budget_df["Category"].isin(BUDGET_EXCLUDED_CATEGORIES)]
+    budgets = budget_df.pivot_table(
+        index=pd.to_datetime(budget_df["Month"]).dt.to_period("M").dt.start_time.rename("Month"),
+        columns="Category",
+        values="Budgeted Amount",
+        aggfunc="sum",
+    )
+
+    month_index = pd.date_range(actuals.index.min(), actuals.index.max(), freq="MS", name="Month")
+    categories = actuals.columns.union(budgets.columns)
+    actuals = actuals.reindex(index=month_index, columns=categories).fillna(0.0)
+    budgets = budgets.reindex(index=month_index, columns=categories).fillna(0.0)
+    variance = actuals - budgets
+    burn_rate = actuals / budgets.where(budgets != 0)
+
+    result = pd.DataFrame(
+        {
+            "Amount": actuals.stack(),
+            "Budgeted_Amount": budgets.stack(),
+            "Budget_Variance": variance.stack(),
+            "Cumulative_Budget_Variance": variance.cumsum().stack(),
+            "Burn_Rate": burn_rate.stack(),
+        }
+    )
+    result = result.rename_axis(["Month", "Category"]).reset_index()
+    result = result[(result["Amount"] != 0) | (result["Budgeted_Amount"] != 0)].reset_index(drop=True)
+    return _budget_actuals_cache.put(cache_key, result)
+
+def monthly_category_totals(df):
+    """
+    Return monthly spend per category as a Month x Category grid.
+
+    The grid runs without gaps from the first to the latest transaction month,
+    with zeros for months without spend, so row offsets are month offsets.
+    Excluded categories are dropped.
+    """
+    fingerprint = frame_fingerprint(df, ["Transaction_Date", "Category", "Amount"])
+    cached = _monthly_totals_cache.get(fingerprint)
+    if cached is not None:
+        return fingerprint, cached
+
+    expenses = df[~df["Category"].isin(BUDGET_EXCLUDED_CATEGORIES)]
+    if expenses.empty:
+        return fingerprint, _monthly_totals_cache.put(fingerprint, pd.DataFrame())
+
+    months = pd.to_datetime(expenses["Transaction_Date"], format="mixed").dt.to_period("M").dt.start_time
+    totals = (
+        expenses.groupby([months.rename("Month"), expenses["Category"]])["Amount"]
+        .sum()
+        .abs()
+        .unstack("Category")
+    )
+    month_index = pd.date_range(totals.index.min(), totals.index.max(), freq="MS", name="Month")
+    totals = totals.reindex(month_index).fillna(0.0)
+    return fingerprint, _monthly_totals_cache.put(fingerprint, totals)
+
+
+def category_baselines(df, baseline="Trailing 12 months"):
+    """
+    Return the expected spend per category for every month.
+
+    Trailing baselines average the preceding N months (excluding the month
+    itself); the year-over-year baseline is the same month one year earlier.
+    Both are window functions over the monthly grid, so they follow the
+    calendar without any hard-coded year.
+
+    Returns:
+    pd.DataFrame: Month, Category and Average_Amount.
+    """
+    fingerprint, totals = monthly_category_totals(df)
+    cache_key = (fingerprint, baseline)
+    cached = _baseline_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    if totals.empty:
+        return _baseline_cache.put(cache_key, pd.DataFrame(columns=["Month", "Category", "Average_Amount"]))
+
+    window = BASELINE_WINDOWS[baseline]
+    if window == YEAR_OVER_YEAR:
+        baselines = totals.shift(12)
+    else:
+        baselines = totals.rolling(window, min_periods=1).mean().shift(1)
+
+    baselines = baselines.stack().rename("Average_Amount").reset_index()
+    return _baseline_cache.put(cache_key, baselines)
+
+
+def current_baselines(baselines):
+    """Return each category's baseline for the latest month, largest first."""
+    current_month = baselines["Month"].max()
+    current = baselines.loc[baselines["Month"] == current_month, ["Category", "Average_Amount"]]
+    current = current.rename(columns={"Average_Amount": "Amount"})
+    current["Amount"] = current["Amount"].round()
+    current = current[current["Amount"] > 0]
+    return current.sort_values(by="Amount", ascending=False).reset_index(drop=True)
+
 
 class BudgetVariance:
     def __init__(self, expenses, budget_amount):
@@ -26,8 +209,7 @@ class BudgetVariance:
         Initialize the Budget class with expenses and budget amount.
         """
         self.budget_amount = budget_amount
-        self.expenses = expenses
-        self.expenses = self.expenses[(~self.expenses["Category"].isin([config["BUDGET_EXCLUDED_CATEGORIES"]]))]  # Filter out credit card payments and Investments
+        self.expenses = expenses[~expenses["Category"].isin(BUDGET_EXCLUDED_CATEGORIES)].copy()  # Filter out credit card payments and Investments
         self.expenses['Transaction_Date'] = pd.to_datetime(self.expenses['Transaction_Date'])
         self.expenses['Month'] = self.expenses['Transaction_Date'].dt.to_period('M')
     
@@ -39,21 +221,12 @@ class BudgetVariance:
             return []
         
         expenses = self.expenses.groupby('Month')['Amount'].sum().abs()
-        expenses = expenses.to_dict()
-        results = []
-        for month, expense in expenses.items():
-            if expense > self.budget_amount:
-                over_budget = expense - self.budget_amount
-                under_budget = 0
-            else:
-                over_budget = 0
-                under_budget = self.budget_amount - expense
-            results.append({
-                'Month': month,
-                'Under Budget': under_budget,
-                'Over Budget': over_budget
-            })
-        return results
+        variance = pd.DataFrame({
+            'Month': expenses.index,
+            'Under Budget': (self.budget_amount - expenses).clip(lower=0).to_numpy(),
+            'Over Budget': (expenses - self.budget_amount).clip(lower=0).to_numpy(),
+        })
+        return variance.to_dict('records')
 
     def get_budget_variance(self):
         """
@@ -74,7 +247,12 @@ class BudgetVariance:
         Generate a summary of monthly expenses.
         """
         if self.expenses.empty:
-            return pd.DataFrame(columns=['Month', 'Category', 'Amount'])
+            # Keep Month period-typed so callers can use the .dt accessor
+            return pd.DataFrame({
+                'Month': pd.Series(dtype='period[M]'),
+                'Category': pd.Series(dtype='object'),
+                'Amount': pd.Series(dtype='float64'),
+            })
         monthly_expenses = self.expenses.groupby(['Month', 'Category'])['Amount'].sum().abs().reset_index()
         return monthly_expenses
     
@@ -0,0 +1,106 @@
+import re
+
+import pandas as pd
+
+from tabs.amount_utils import normalize_amount_series
+from tabs.transaction_fingerprint import TRANSACTION_ID_COLUMN, canonical_description
+
+PREVIEW_GROUP_COLUMNS = ["Account_Type", "Category"]
+
+
+class DescriptionIndex:
+    """
+    Canonical descriptions factorized once per dataset.
+
+    Patterns are matched against the distinct canonical descriptions only and
+    mapped back to rows through the factor codes, so a search over the full
+    history costs one pass over a few thousand merchants rather than every row.
+    """
+
+    def __init__(self, descriptions: pd.Series):
+        self.codes, self.uniques = pd.factorize(
+            canonical_description(descriptions), use_na_sentinel=True
+        )
+        self.uniques = pd.Series(self.uniques, dtype="string")
+        self.index = descriptions.index
+
+    def match(self, pattern: str, regex: bool = False) -> pd.Series:
+        """
+        Return a row mask for descriptions containing `pattern`.
+
+        Raises:
+        ValueError: If a plain-text `pattern` has no characters left once
+        canonicalized (only punctuation or spaces), since it would match
+        every transaction.
+        """
+        if regex:
+            matched = self.uniques.str.contains(pattern, flags=re.IGNORECASE, regex=True)
+        else:
+            needle = canonical_description(pd.Series([pattern])).iloc[0]
+            if pd.isna(needle) or not needle:
+                raise ValueError(f"Pattern {pattern!r} has no text left to match once normalized.")
+            matched = self.uniques.str.contains(needle, regex=False)
+        matched = matched.fillna(False).to_numpy(dtype=bool)
+        mask = matched[self.codes] & (self.codes >= 0)
+        return pd.Series(mask, index=self.index)
+
+
+def match_transactions(
+    df: pd.DataFrame,
+    pattern: str,
+    regex: bool = False,
+    account_types=None,
+    amount_range=None,
+    date_range=None,
+    description_index=None,
+) -> pd.Series:
+    """
+    Return a boolean mask of the transactions a bulk rule applies to.
+
+    Parameters:
+    pattern (str): Text (or a regular expression) matched against the canonical description.
+    account_types (list): Optional account types to restrict to.
+    amount_range (tuple): Optional inclusive (min, max) amount bounds; either side may be None.
+    date_range (tuple): Optional inclusive (start, end) transaction dates; either side may be None.
+    description_index (DescriptionIndex): Prebuilt index for `df`, reused across previews.
+    """
+    description_index = description_index or DescriptionIndex(df["Description"])
+    mask = description_index.match(pattern, regex=regex)
+
+    if account_types:
+        mask &= df["Account_Type"].isin(account_types)
+
+    if amount_range is not None:
+        amounts = normalize_amount_series(df["Amount"])
+        low, high = amount_range
+        if low is not None:
+            mask &= amounts >= low
+        if high is not None:
+            mask &= amounts <= high
+
+    if date_range is not None:
+        transaction_dates = pd.to_datetime(df["Transaction_Date"], format="mixed", errors="coerce")
+        start, end = date_range
+        if start is not None:
+            mask &= transaction_dates >= pd.Timestamp(start)
+        if end is not None:
+            mask &= transaction_dates <= pd.Timestamp(end)
+
+    return mask.fillna(False).astype(bool)
+
+
+def preview_recategorization(df: pd.DataFrame, mask: pd.Series, new_category: str) -> pd.DataFrame:
+    """Count matched transactions by account and current category."""
+    matched = df.loc[mask, PREVIEW_GROUP_COLUMNS].fillna("Uncategorized")
+    if matched.empty:
+        return pd.DataFrame(columns=PREVIEW_GROUP_COLUMNS + ["Transactions", "Changes"])
+    preview = matched.groupby(PREVIEW_GROUP_COLUMNS, sort=True).size().rename("Transactions")
+    preview = preview.reset_index()
+    preview["Changes"] = preview["Category"].ne(new_category) * preview["Transactions"]
+    return preview.sort_values("Transactions", ascending=False, kind="mergesort")
+
+
+def recategorization_changes(df: pd.DataFrame, mask: pd.Series, new_category: str) -> dict:
+    """Return the new category keyed by transaction ID for matched rows that change."""
+    changed = mask & df["Category"].ne(new_category)
+    return dict.fromkeys(df.loc[changed, TRANSACTION_ID_COLUMN].tolist(), new_category)
@@ -0,0 +1,87 @@
+import hashlib
+import sys
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+
+def frame_fingerprint(df: pd.DataFrame, columns=None) -> str:
+    """
+    Return a digest identifying the contents of `df`.
+
+    Only `columns` are hashed when given, so a cache keyed on the fingerprint is
+    invalidated by changes to the data a computation reads and nothing else.
+    The row index is included, which distinguishes differently filtered views
+    of the same dataset.
+    """
+    if columns is not None:
+        df = df.reindex(columns=[column for column in columns if column in df.columns])
+    digest = hashlib.sha1()
+    digest.update(repr((df.shape, df.columns.tolist())).encode("utf-8"))
+    if not df.empty:
+        digest.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+class LRUCache:
+    """
+    Small in-process least-recently-used cache.
+
+    Module-level instances survive Streamlit reruns, so results computed for one
+    dataset version and filter are reused until they are evicted. When `maxbytes`
+    is given, entries are also evicted until the sizes reported by `sizeof` fit.
+    Streamlit runs each session's script in its own thread, so every operation
+    holds the instance lock.
+    """
+
+    def __init__(self, maxsize=32, maxbytes=None, sizeof=None):
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+        self.sizeof = sizeof or sys.getsizeof
+        self.nbytes = 0
+        self._entries = OrderedDict()
+        self._sizes = {}
+        self._lock = threading.Lock()
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._entries:
+                return default
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def put(self, key, value):
+        # Sized outside the lock; sizeof may serialize or walk a large value
+        size = self.sizeof(value) if self.maxbytes is not None else 0
+        with self._lock:
+            if self.maxbytes is not None:
+                self.nbytes += size - self._sizes.get(key, 0)
+                self._sizes[key] = size
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize or (
+                self.maxbytes is not None and self.nbytes > self.maxbytes and len(self._entries) > 1
+            ):
+                evicted, _ = self._entries.popitem(last=False)
+                self.nbytes -= self._sizes.pop(evicted, 0)
+        return value
+
+    def pop(self, key, default=None):
+        with self._lock:
+            self.nbytes -= self._sizes.pop(key, 0)
+            return self._entries.pop(key, default)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self.nbytes = 0
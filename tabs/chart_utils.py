@@ -0,0 +1,161 @@
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.io as pio
+
+from tabs.cache_utils import LRUCache, frame_fingerprint
+
+# Upper bound on points sent to the browser for one chart.
+MAX_CHART_POINTS = 4000
+# Every series keeps at least this many points, however many series are drawn.
+MIN_SERIES_POINTS = 100
+# Above this many points, line charts switch to WebGL (scattergl) traces.
+WEBGL_POINT_THRESHOLD = 1000
+# Category charts keep the largest categories and fold the rest into OTHER_LABEL.
+MAX_CATEGORIES = 20
+MAX_LINE_SERIES = 12
+OTHER_LABEL = "Other"
+# Serialized figures kept between reruns.
+FIGURE_CACHE_SIZE = 64
+FIGURE_CACHE_BYTES = 32 * 1024 * 1024
+
+_figure_cache = LRUCache(maxsize=FIGURE_CACHE_SIZE, maxbytes=FIGURE_CACHE_BYTES, sizeof=len)
+
+
+def _numeric_axis(values: pd.Series) -> np.ndarray:
+    """Return x values as floats; non-numeric axes fall back to their position."""
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values.to_numpy(dtype="datetime64[ns]").astype(np.int64).astype(np.float64)
+    if pd.api.types.is_numeric_dtype(values):
+        return values.to_numpy(dtype=np.float64)
+    return np.arange(len(values), dtype=np.float64)
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Select `threshold` points with Largest-Triangle-Three-Buckets.
+
+    The first and last points are always kept. Each bucket in between keeps the
+    point forming the largest triangle with the previously kept point and the
+    mean of the next bucket, which preserves peaks and troughs of the series.
+
+    Returns:
+        np.ndarray: Sorted positions of the kept points.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    kept = np.empty(threshold, dtype=np.int64)
+    kept[0], kept[-1] = 0, n - 1
+    previous = 0
+    for bucket in range(threshold - 2):
+        start, stop = edges[bucket], edges[bucket + 1]
+        next_stop = edges[bucket + 2] if bucket + 2 < len(edges) else n
+        next_x = x[stop:next_stop].mean()
+        next_y = y[stop:next_stop].mean()
+        areas = np.abs(
+            (x[previous] - next_x) * (y[start:stop] - y[previous])
+            - (x[previous] - x[start:stop]) * (next_y - y[previous])
+        )
+        previous = start + int(np.argmax(areas))
+        kept[bucket + 1] = previous
+    return kept
+
+
+def top_n_categories(df: pd.DataFrame, category: str, value: str, n: int = MAX_CATEGORIES) -> pd.DataFrame:
+    """
+    Keep the `n` largest categories by absolute value and sum the rest into OTHER_LABEL.
+
+    `df` holds one row per category, as fed to bar, treemap and pie charts.
+    """
+    if len(df) <= n:
+        return df
+    order = df[value].abs().sort_values(ascending=False).index
+    head, tail = df.loc[order[: n - 1]], df.loc[order[n - 1 :]]
+    other = pd.DataFrame({category: [OTHER_LABEL], value: [tail[value].sum()]})
+    return pd.concat([head, other], ignore_index=True)
+
+
+def _fold_series(long_df, x, y, color, max_series):
+    """Sum all but the `max_series - 1` largest series into an OTHER_LABEL series."""
+    totals = long_df.groupby(color, sort=False)[y].apply(lambda values: values.abs().sum())
+    if len(totals) <= max_series:
+        return long_df
+    keep = totals.nlargest(max_series - 1).index
+    kept = long_df[long_df[color].isin(keep)]
+    other = (
+        long_df[~long_df[color].isin(keep)]
+        .groupby(x, sort=True)[y]
+        .sum()
+        .reset_index()
+        .assign(**{color: OTHER_LABEL})
+    )
+    return pd.concat([kept, other], ignore_index=True)
+
+
+def downsample_lines(
+    df: pd.DataFrame,
+    x: str,
+    y: str,
+    color=None,
+    max_points: int = MAX_CHART_POINTS,
+    max_series: int = MAX_LINE_SERIES,
+) -> pd.DataFrame:
+    """
+    Reduce a long-form line frame to at most `max_points` points.
+
+    Series beyond `max_series` are folded into OTHER_LABEL, then each series is
+    downsampled with LTTB to an equal share of the point budget.
+    """
+    if color is not None:
+        df = _fold_series(df, x, y, color, max_series)
+    groups = [df] if color is None else [group for _, group in df.groupby(color, sort=False)]
+    per_series = max(max_points // max(len(groups), 1), MIN_SERIES_POINTS)
+    if all(len(group) <= per_series for group in groups):
+        return df
+
+    sampled = []
+    for group in groups:
+        if pd.api.types.is_numeric_dtype(group[x]) or pd.api.types.is_datetime64_any_dtype(group[x]):
+            group = group.sort_values(x, kind="mergesort")
+        values = group[y].to_numpy(dtype=np.float64)
+        keep = lttb_indices(_numeric_axis(group[x]), np.nan_to_num(values), per_series)
+        sampled.append(group.iloc[keep])
+    return pd.concat(sampled, ignore_index=True)
+
+
+def line_chart(df: pd.DataFrame, x: str, y, color=None, **kwargs):
+    """
+    Build a `px.line` figure after server-side downsampling.
+
+    Wide input (a list of `y` columns) is melted into px's own `variable`/`value`
+    layout first, so `labels` written for `px.line` keep working. Figures with
+    more than WEBGL_POINT_THRESHOLD points are rendered with WebGL traces.
+    """
+    if isinstance(y, (list, tuple)):
+        id_columns = [x] + [column for column in kwargs.get("hover_data") or [] if column not in y]
+        df = df.melt(id_vars=id_columns, value_vars=list(y), var_name="variable", value_name="value")
+        y, color = "value", "variable"
+
+    df = downsample_lines(df, x, y, color)
+    render_mode = "webgl" if len(df) > WEBGL_POINT_THRESHOLD else "auto"
+    return px.line(df, x=x, y=y, color=color, render_mode=render_mode, **kwargs)
+
+
+def cached_figure(name: str, data, build, *options):
+    """
+    Return the figure `build()` makes for `data`, memoized across reruns.
+
+    The key combines `name`, the fingerprint of the aggregated `data` the figure
+    is drawn from (which reflects both the dataset version and the active
+    filters) and any view `options`. Figures are stored as JSON, bounded by
+    FIGURE_CACHE_SIZE entries and FIGURE_CACHE_BYTES in total.
+    """
+    frame = data.to_frame() if isinstance(data, pd.Series) else data
+    key = (name, frame_fingerprint(frame), options)
+    figure_json = _figure_cache.get(key)
+    if figure_json is None:
+        figure_json = _figure_cache.put(key, build().to_json())
+    return pio.from_json(figure_json, skip_invalid=True)
@@ -3,7 +3,15 @@ import pandas as pd
 import plotly.express as px
 from tabs.expenses import Expenses
 from tabs.trends import FinanceTrends
-from tabs.budget import BudgetVariance
+from tabs.chart_utils import cached_figure, line_chart
+from tabs.budget import (
+    BASELINE_WINDOWS,
+    BudgetVariance,
+    budget_vs_actuals,
+    category_baselines,
+    current_baselines,
+    read_budget_file,
+)
 import boto3
 import json
 import plotly.express as px
@@ -87,68 +95,72 @@ class Dashboard:
             # Display monthly expense summary
             if not filtered_df.empty:
                 get_monthly_expense_summary = budget.get_monthly_expense_summary()
-                print(get_monthly_expense_summary)
-            
-                # Filter the dataframe to include only 2024 transactions
-                df = self.df.copy(deep=False)
-                df["Transaction_Date"] = pd.to_datetime(df["Transaction_Date"])
-                df = df[df["Transaction_Date"].dt.year == 2024]
-                if not df.empty:
-                    category_budget = BudgetVariance(df, budget_amount)
-                    monthly_average = category_budget.get_monthly_expense_average()
-                    
-                    # Merge the average expenses into the monthly expense summary
-                    merged_df = get_monthly_expense_summary.merge(
-                    monthly_average, 
-                    on='Category', 
-                    how='left', 
-                    suffixes=('', '_Average')
-                    )
-                    
-                    # Rename the columns for clarity
-                    merged_df.rename(columns={'Amount_Average': 'Average_Amount'}, inplace=True)
 
-                    # Calculate the variance between actual amount and average amount
-                    merged_df['Variance'] = merged_df['Amount'] - merged_df['Average_Amount']
+                get_monthly_expense_summary["Month"] = get_monthly_expense_summary["Month"].dt.to_timestamp()
 
-                    obj = s3.get_object(Bucket=bucket_name, Key=budget_file_key)
-                    budget_df = pd.read_csv(obj['Body'])
+                # Compare each month against a rolling baseline computed over the full history
+                baseline = st.selectbox(
+                    "Compare against",
+                    options=list(BASELINE_WINDOWS),
+                    index=2,
+                    key="budget_baseline"
+                )
+                baselines = category_baselines(self.df, baseline)
+                if not baselines.empty:
+                    monthly_average = current_baselines(baselines)
 
-                    # Filter the budget dataframe to include only the relevant categories and months
-                    budget_df["Month"] = pd.to_datetime(budget_df["Month"])
+                    # Merge the baseline expenses into the monthly expense summary
+                    merged_df = get_monthly_expense_summary.merge(
+                    baselines,
+                    on=['Month', 'Category'],
+                    how='left'
+                    )
 
-                    # Group by category and sum the budgeted amounts
-                    budget_summary = budget_df.groupby("Category")["Budgeted Amount"].sum().reset_index()
+                    # Calculate the variance between actual amount and baseline amount
+                    merged_df['Variance'] = merged_df['Amount'] - merged_df['Average_Amount']
 
-                    # Merge the budgeted amounts into the merged dataframe
+                    # Align actuals with the per-month, per-category budget
+                    budget_df, budget_version = read_budget_file()
+                    budget_actuals = budget_vs_actuals(filtered_df, budget_df, budget_version)
                     merged_df = merged_df.merge(
-                    budget_summary, 
-                    on="Category", 
-                    how="left", 
-                    suffixes=("", "_Budgeted")
+                    budget_actuals.drop(columns="Amount"),
+                    on=["Month", "Category"],
+                    how="left"
                     )
 
-                    # Rename the columns for clarity
-                    merged_df.rename(columns={"Budgeted Amount": "Budgeted_Amount"}, inplace=True)
-
-                    # Calculate the variance between actual amount and budgeted amount
-                    merged_df["Budget_Variance"] = merged_df["Amount"] - merged_df["Budgeted_Amount"]
-                    
                     st.dataframe(merged_df, use_container_width=True)
 
+                    st.subheader("Cumulative Budget Variance by Category")
+                    if budget_actuals.empty:
+                        st.warning("No budget data available for the selected filters.")
+                    else:
+                        fig = cached_figure("budget_variance", budget_actuals, lambda: line_chart(
+                        budget_actuals,
+                        x='Month',
+                        y='Cumulative_Budget_Variance',
+                        color='Category',
+                        hover_data=['Amount', 'Budgeted_Amount', 'Burn_Rate'],
+                        title='Cumulative Variance (Actual - Budget)'
+                        ))
+                        st.plotly_chart(fig, use_container_width=True)
+
                     st.subheader("Tree Map of Average Expenses By Category")
 
                     # Information text about the chart
                     st.info("NOTE: Credit Card Payment and Investments are excluded from the calculation.")
 
                     # Create a tree map for average expenses by category with labels
-                    fig = px.treemap(
-                    monthly_average, 
-                    path=['Category'], 
-                    values='Amount', 
-                    labels={'Amount': 'Average Expense'}
-                    )
-                    fig.update_traces(textinfo='label+value', valuessrc='$,.2f')
+                    def build_average_treemap():
+                        fig = px.treemap(
+                        monthly_average, 
+                        path=['Category'], 
+                        values='Amount', 
+                        labels={'Amount': 'Average Expense'}
+                        )
+                        fig.update_traces(textinfo='label+value', valuessrc='$,.2f')
+                        return fig
+
+                    fig = cached_figure("budget_average_treemap", monthly_average, build_average_treemap)
                     st.plotly_chart(fig, use_container_width=True)
 
                     st.subheader("Total of Average Expenses")
@@ -158,21 +170,19 @@ class Dashboard:
 
                     st.subheader("Monthly Expense Trend by Category")
                     # Plot monthly expense trend by category
-                    get_monthly_expense_summary["Month"] = get_monthly_expense_summary["Month"].dt.to_timestamp()
-
                     # Plotly line plot for monthly expenses by category
-                    fig = px.line(
+                    fig = cached_figure("budget_monthly_trend", get_monthly_expense_summary, lambda: line_chart(
                     get_monthly_expense_summary, 
                     x='Month', 
                     y='Amount', 
                     color='Category', 
                     title='Monthly Expense Trend by Category'
-                    )
+                    ))
 
                     # Display the chart
                     st.plotly_chart(fig, use_container_width=True)
                 else:
-                    st.warning("No data available for the year 2024.")
+                    st.warning("No expense history available for the selected baseline.")
             else:
                 st.warning("No data available for the selected filters.")
 
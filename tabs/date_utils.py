@@ -0,0 +1,107 @@
+import json
+from typing import Optional
+
+import pandas as pd
+
+from tabs.cache_utils import LRUCache
+
+config = json.load(open("assets/config.json"))
+
+ACCOUNT_DATE_FORMATS = config.get("DATE_FORMATS", {})
+ISO_DATE_FORMAT = "%Y-%m-%d"
+DATE_FORMAT_METADATA_KEY = "date-format"
+DATE_FORMAT_CANDIDATES = [
+    "%m/%d/%Y",
+    ISO_DATE_FORMAT,
+    "%m/%d/%y",
+    "%m-%d-%Y",
+    "%Y/%m/%d",
+    "%d/%m/%Y",
+    "%Y-%m-%d %H:%M:%S",
+    "%b %d, %Y",
+]
+DETECTION_SAMPLE_SIZE = 200
+DETECTED_FORMAT_CACHE_SIZE = 256
+
+# Formats detected for files without a registered or recorded format, keyed by file.
+_detected_formats = LRUCache(maxsize=DETECTED_FORMAT_CACHE_SIZE)
+_MISSING = object()
+
+
+def date_format_for_account(account_type: str) -> Optional[str]:
+    """Return the registered date format for an account type, if any."""
+    return ACCOUNT_DATE_FORMATS.get(account_type)
+
+
+def _distinct_date_strings(series: pd.Series) -> pd.Series:
+    values = series.dropna().astype(str).str.strip()
+    return values[values != ""].drop_duplicates()
+
+
+def _format_matches(values: pd.Series, date_format: str) -> bool:
+    parsed = pd.to_datetime(values, format=date_format, errors="coerce")
+    return bool(parsed.notna().all())
+
+
+def detect_date_format(series: pd.Series) -> Optional[str]:
+    """Detect the first candidate format that parses a sample of distinct values."""
+    sample = _distinct_date_strings(series).head(DETECTION_SAMPLE_SIZE)
+    if sample.empty:
+        return None
+    for date_format in DATE_FORMAT_CANDIDATES:
+        if _format_matches(sample, date_format):
+            return date_format
+    return None
+
+
+def resolve_date_format(
+    series: pd.Series,
+    date_format: Optional[str] = None,
+    cache_key: Optional[str] = None,
+) -> Optional[str]:
+    """
+    Return a date format validated against the column.
+
+    The supplied format is checked against a sample of distinct values first.
+    If it does not fit, the format is detected once and cached under `cache_key`.
+    """
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return None
+
+    sample = _distinct_date_strings(series).head(DETECTION_SAMPLE_SIZE)
+    if sample.empty:
+        return date_format
+
+    if date_format and _format_matches(sample, date_format):
+        return date_format
+
+    if cache_key is not None:
+        cached_format = _detected_formats.get(cache_key, _MISSING)
+        if cached_format is not _MISSING:
+            return cached_format
+
+    detected_format = detect_date_format(sample)
+    if cache_key is not None:
+        _detected_formats.put(cache_key, detected_format)
+    return detected_format
+
+
+def forget_detected_format(cache_key: str) -> None:
+    """Drop the format detected under `cache_key`, e.g. when its file is replaced."""
+    _detected_formats.pop(cache_key)
+
+
+def parse_date_series(
+    series: pd.Series,
+    date_format: Optional[str] = None,
+    cache_key: Optional[str] = None,
+) -> pd.Series:
+    """Parse a date column with an explicit format, falling back to inference."""
+    return parse_dates_with_format(series, resolve_date_format(series, date_format, cache_key))
+
+
+def parse_dates_with_format(series: pd.Series, resolved_format: Optional[str]) -> pd.Series:
+    """Parse a date column with a format already returned by `resolve_date_format`."""
+    if resolved_format is None:
+        return pd.to_datetime(series, format="mixed", errors="coerce")
+    return pd.to_datetime(series, format=resolved_format, errors="coerce")
@@ -0,0 +1,140 @@
+import json
+import os
+import uuid
+from datetime import datetime
+
+import boto3
+import pandas as pd
+from dotenv import load_dotenv
+
+from tabs.cache_utils import LRUCache, frame_fingerprint
+from tabs.transaction_fingerprint import TRANSACTION_ID_COLUMN
+
+load_dotenv()
+
+config = json.load(open("assets/config.json"))
+
+s3 = boto3.client(
+    "s3",
+    aws_access_key_id=os.environ["AWS_ACCESS_KEY_ID"],
+    aws_secret_access_key=os.environ["AWS_SECRET_ACCESS_KEY"],
+)
+
+bucket_name = config["S3_BUCKET_NAME"]
+EDIT_JOURNAL_PREFIX = config["EDIT_JOURNAL_PREFIX"]
+EDIT_JOURNAL_COMPACT_AFTER = config["EDIT_JOURNAL_COMPACT_AFTER"]
+JOURNAL_COLUMNS = [TRANSACTION_ID_COLUMN, "Category"]
+
+# Records are write-once, so a record key identifies its contents for good.
+_record_cache = LRUCache(maxsize=max(4 * EDIT_JOURNAL_COMPACT_AFTER, 64))
+_applied_cache = LRUCache(maxsize=4)
+
+
+class EditJournal:
+    """
+    Append-only log of category change sets keyed by transaction ID.
+
+    Each save writes one small JSON record instead of rewriting the edited
+    dataset. Records are overlaid on the dataset when it is loaded and folded
+    into it by `compact`.
+    """
+
+    def __init__(self, prefix=EDIT_JOURNAL_PREFIX):
+        self.prefix = prefix
+        self.loaded_keys = []
+
+    def list_record_keys(self):
+        response = s3.list_objects_v2(Bucket=bucket_name, Prefix=self.prefix)
+        return sorted(
+            obj["Key"] for obj in response.get("Contents", []) if obj["Key"].endswith(".json")
+        )
+
+    def record(self, changes, source="editor"):
+        """
+        Persist one change set.
+
+        Parameters:
+        changes (dict): New categories keyed by transaction ID.
+        source (str): What produced the change set, e.g. "editor" or "bulk".
+
+        Returns:
+        str: The S3 key of the new record, or None when there was nothing to save.
+        """
+        if not changes:
+            return None
+
+        created_at = datetime.now()
+        record_key = (
+            f"{self.prefix}{created_at.strftime('%Y%m%d_%H%M%S_%f')}_{uuid.uuid4().hex[:8]}.json"
+        )
+        body = {
+            "created_at": created_at.isoformat(timespec="seconds"),
+            "source": source,
+            "changes": [
+                {TRANSACTION_ID_COLUMN: int(transaction_id), "Category": category}
+                for transaction_id, category in changes.items()
+            ],
+        }
+        s3.put_object(Bucket=bucket_name, Key=record_key, Body=json.dumps(body))
+        return record_key
+
+    def load_changes(self):
+        """Return the latest category per transaction ID across all records."""
+        self.loaded_keys = self.list_record_keys()
+        frames = []
+        for record_key in self.loaded_keys:
+            frame = _record_cache.get(record_key)
+            if frame is None:
+                obj = s3.get_object(Bucket=bucket_name, Key=record_key)
+                frame = _record_cache.put(
+                    record_key, pd.DataFrame(json.loads(obj["Body"].read())["changes"])
+                )
+            frames.append(frame)
+
+        if not frames:
+            return pd.DataFrame(columns=JOURNAL_COLUMNS)
+        changes = pd.concat(frames, ignore_index=True).reindex(columns=JOURNAL_COLUMNS)
+        return changes.astype({TRANSACTION_ID_COLUMN: "int64"}).drop_duplicates(
+            subset=[TRANSACTION_ID_COLUMN], keep="last"
+        )
+
+    def apply(self, df):
+        """
+        Overlay journaled category changes onto a dataset with transaction IDs.
+
+        Only new records are fetched; the overlaid result is reused while the
+        dataset and the set of record keys are unchanged, so a rerun costs one
+        LIST when nothing was edited.
+        """
+        if df.empty or TRANSACTION_ID_COLUMN not in df.columns:
+            return df
+
+        changes = self.load_changes()
+        if changes.empty:
+            return df
+
+        cache_key = (frame_fingerprint(df), tuple(self.loaded_keys))
+        applied_df = _applied_cache.get(cache_key)
+        if applied_df is None:
+            applied_df = df.copy()
+            latest_categories = pd.Series(
+                changes["Category"].to_numpy(),
+                index=pd.Index(changes[TRANSACTION_ID_COLUMN].to_numpy()),
+            )
+            journaled_categories = applied_df[TRANSACTION_ID_COLUMN].map(latest_categories)
+            applied_df["Category"] = journaled_categories.combine_first(applied_df["Category"])
+            _applied_cache.put(cache_key, applied_df)
+        # Callers modify the result, so the cached frame is never handed out
+        return applied_df.copy()
+
+    def clear(self, record_keys=None):
+        """Delete journal records, by default the ones read by the last load."""
+        record_keys = self.loaded_keys if record_keys is None else record_keys
+        for start in range(0, len(record_keys), 1000):
+            s3.delete_objects(
+                Bucket=bucket_name,
+                Delete={"Objects": [{"Key": key} for key in record_keys[start:start + 1000]]},
+            )
+
+    def needs_compaction(self):
+        return len(self.list_record_keys()) >= EDIT_JOURNAL_COMPACT_AFTER
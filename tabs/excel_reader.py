@@ -0,0 +1,95 @@
+import os
+from functools import lru_cache
+from typing import Dict, Iterator, List, Optional
+
+import pandas as pd
+from openpyxl import load_workbook
+
+EXCEL_CHUNK_SIZE = 50_000
+CATEGORY_COLUMN = "Custom Categories"
+
+
+def _rows_to_frame(rows: List[tuple], columns: List[str], schema: Dict[str, object]) -> pd.DataFrame:
+    """
+    Build a chunk and coerce it to the dtypes pinned by earlier chunks.
+
+    A column's dtype is pinned by the first chunk in which it has values. Integer
+    columns that gain blanks widen to float and values that do not fit the pinned
+    dtype turn the column into object, as `pd.read_excel` infers for the file.
+    """
+    # Read-only worksheets can return short rows when trailing cells are empty.
+    width = len(columns)
+    padded_rows = [tuple(row[:width]) + (None,) * (width - len(row)) for row in rows]
+    frame = pd.DataFrame(padded_rows, columns=columns).infer_objects()
+    for column in columns:
+        values = frame[column]
+        if column not in schema:
+            if values.notna().any():
+                schema[column] = values.dtype
+            continue
+        if values.dtype == schema[column]:
+            continue
+        try:
+            frame[column] = values.astype(schema[column])
+        except (TypeError, ValueError):
+            numeric = pd.api.types.is_numeric_dtype(schema[column]) and pd.api.types.is_numeric_dtype(values)
+            frame[column] = values.astype("float64" if numeric else object)
+    return frame
+
+
+def iter_excel_chunks(
+    source, chunksize: int = EXCEL_CHUNK_SIZE, sheet_name: Optional[str] = None
+) -> Iterator[pd.DataFrame]:
+    """
+    Stream a worksheet as typed DataFrame chunks.
+
+    The workbook is opened in openpyxl's read-only, values-only mode so rows are
+    read lazily instead of building the full workbook object model. The first row
+    is used as the header and fully blank rows are skipped. Column dtypes are
+    pinned across chunks so every chunk of a column has the same type.
+    """
+    workbook = load_workbook(source, read_only=True, data_only=True)
+    try:
+        worksheet = workbook[sheet_name] if sheet_name else workbook.worksheets[0]
+        rows = worksheet.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+
+        columns = [
+            str(column) if column is not None else f"Unnamed: {index}"
+            for index, column in enumerate(header)
+        ]
+        schema = {}
+        batch = []
+        for row in rows:
+            if all(value is None for value in row):
+                continue
+            batch.append(row)
+            if len(batch) >= chunksize:
+                yield _rows_to_frame(batch, columns, schema)
+                batch = []
+
+        if batch:
+            yield _rows_to_frame(batch, columns, schema)
+    finally:
+        workbook.close()
+
+
+def read_excel(source, sheet_name: Optional[str] = None) -> pd.DataFrame:
+    """Read a whole worksheet through the streaming reader."""
+    chunks = list(iter_excel_chunks(source, sheet_name=sheet_name))
+    if not chunks:
+        return pd.DataFrame()
+    return pd.concat(chunks, ignore_index=True)
+
+
+@lru_cache(maxsize=8)
+def _cached_categories(file_path: str, modified_time: float) -> tuple:
+    categories_df = read_excel(file_path)
+    return tuple(sorted(categories_df[CATEGORY_COLUMN].dropna().unique().tolist()))
+
+
+def load_predefined_categories(file_path: str) -> List[str]:
+    """Return the sorted custom categories, cached until the workbook changes."""
+    return list(_cached_categories(file_path, os.path.getmtime(file_path)))
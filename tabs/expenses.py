@@ -6,6 +6,10 @@ import boto3
 import json
 import os
 from dotenv import load_dotenv
+from tabs.anomaly_detector import AnomalyDetector
+from tabs.chart_utils import cached_figure, top_n_categories
+from tabs.recurring_detector import RecurringDetector
+from tabs.transaction_fingerprint import TRANSACTION_ID_COLUMN
 load_dotenv()
 
 # Load configuration
@@ -238,26 +242,36 @@ class Expenses:
 
             summary = filtered_df.groupby("Category")["Amount"].sum().abs().reset_index()
             summary = summary.sort_values(by="Amount", ascending=False)
-            fig = px.bar(summary, x="Amount", y="Category", orientation='h', 
-                        title="Total Amount by Category", text_auto='.2s')
+            # Charts show the largest categories; the table view keeps all of them
+            chart_summary = top_n_categories(summary, "Category", "Amount")
 
-            fig.update_layout(xaxis_tickformat='$,.2f', font=dict(size=24))
+            def build_bar():
+                fig = px.bar(chart_summary, x="Amount", y="Category", orientation='h', 
+                            title="Total Amount by Category", text_auto='.2s')
+                fig.update_layout(xaxis_tickformat='$,.2f', font=dict(size=24))
+                return fig
+
+            def build_tree():
+                tree_fig = px.treemap(chart_summary, path=["Category"], values='Amount', title="Tree Plot of Amounts")
+                tree_fig.update_traces(textinfo="label+value")
+                return tree_fig
+
+            def build_bubble():
+                return px.scatter(chart_summary, x="Amount", y="Category", size="Amount", color="Category", title="Bubble Chart of Amounts")
             
             # Create a toggle to switch between tree plot, bar chart, bubble chart, and table view
             view_option = st.radio("Select View", ("Tree Plot", "Bar Chart", "Bubble Chart", "Table View"), index=0, horizontal=True)
 
+            # Figures are memoized per aggregated summary and view, so toggling views reuses them
             if view_option == "Tree Plot":
                 # Display the tree plot
-                tree_fig = px.treemap(summary, path=["Category"], values='Amount', title="Tree Plot of Amounts")
-                tree_fig.update_traces(textinfo="label+value")
-                st.plotly_chart(tree_fig, use_container_width=True)
+                st.plotly_chart(cached_figure("expenses", chart_summary, build_tree, view_option), use_container_width=True)
             elif view_option == "Bar Chart":
                 # Display the bar chart
-                st.plotly_chart(fig, use_container_width=True)
+                st.plotly_chart(cached_figure("expenses", chart_summary, build_bar, view_option), use_container_width=True)
             elif view_option == "Bubble Chart":
                 # Display a simple bubble chart
-                bubble_fig = px.scatter(summary, x="Amount", y="Category", size="Amount", color="Category", title="Bubble Chart of Amounts")
-                st.plotly_chart(bubble_fig, use_container_width=True)
+                st.plotly_chart(cached_figure("expenses", chart_summary, build_bubble, view_option), use_container_width=True)
             elif view_option == "Table View":
                 # Display the table view
                 st.dataframe(summary.reset_index(drop=True), use_container_width=True)
@@ -274,6 +288,77 @@ class Expenses:
             st.warning("No data available for the selected filters.")
             
 
+    def show_anomalies(self):
+        """
+        Displays transactions in the current filter that were flagged as unusually large.
+        """
+        if self.filtered_df.empty or TRANSACTION_ID_COLUMN not in self.filtered_df.columns:
+            return
+
+        flags = AnomalyDetector().load_flags()
+        if flags.empty:
+            return
+
+        flagged_df = self.filtered_df.merge(flags, on=TRANSACTION_ID_COLUMN, how="inner")
+        if flagged_df.empty:
+            return
+
+        st.subheader("Unusual Transactions")
+        st.info(
+            "NOTE: These transactions are well above the usual spend for the same merchant "
+            "(or category, for new merchants). The score is in standard deviations."
+        )
+        flagged_df = flagged_df.sort_values(by="Anomaly_Score", ascending=False)
+        st.dataframe(
+            flagged_df[[
+                "Transaction_Date",
+                "Description",
+                "Category",
+                "Account_Type",
+                "Amount",
+                "Expected_Amount",
+                "Anomaly_Score",
+                "Anomaly_Scope",
+            ]],
+            use_container_width=True,
+            hide_index=True,
+        )
+
+    def show_recurring_charges(self):
+        """
+        Displays detected subscriptions and other recurring charges for the selected accounts.
+        """
+        recurring = RecurringDetector().load()
+        if recurring.empty or self.filtered_df.empty:
+            return
+
+        recurring = recurring[recurring["Account_Type"].isin(self.filtered_df["Account_Type"].astype(str).unique())]
+        if recurring.empty:
+            return
+
+        st.subheader("Recurring Charges")
+        # Series whose next charge is overdue by more than one cycle have likely been cancelled
+        active = recurring["Next_Date"] + (recurring["Next_Date"] - recurring["Last_Date"]) >= pd.Timestamp.today().normalize()
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Active Subscriptions", int(active.sum()))
+        col2.metric("Monthly Cost", f"${recurring.loc[active, 'Monthly_Cost'].sum():,.2f}")
+        col3.metric("Price Changes", int((recurring.loc[active, "Price_Changes"] > 0).sum()))
+
+        st.dataframe(
+            recurring[active],
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                "First_Date": st.column_config.DateColumn("First_Date"),
+                "Last_Date": st.column_config.DateColumn("Last_Date"),
+                "Next_Date": st.column_config.DateColumn("Next_Date"),
+                "Last_Price_Change": st.column_config.DateColumn("Last_Price_Change"),
+            },
+        )
+        if (~active).any():
+            with st.expander(f"Inactive Recurring Charges ({int((~active).sum())})"):
+                st.dataframe(recurring[~active], use_container_width=True, hide_index=True)
+
     def show_full_tabular_view(self):
         """
         Displays a full tabular view of the filtered DataFrame.
@@ -301,4 +386,8 @@ class Expenses:
 
         self.show_dashboard()
 
+        self.show_anomalies()
+
+        self.show_recurring_charges()
+
         self.show_full_tabular_view()
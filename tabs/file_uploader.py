@@ -4,9 +4,19 @@ import os
 from datetime import datetime
 import re
 import json
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 import boto3
 from io import BytesIO
 from dotenv import load_dotenv
+from tabs.date_utils import (
+    DATE_FORMAT_METADATA_KEY,
+    date_format_for_account,
+    parse_date_series,
+    resolve_date_format,
+)
+from tabs.excel_reader import iter_excel_chunks
+from tabs.statement_parser import forget_statement_date_formats
 from tabs.transaction_service import TransactionService
 load_dotenv()
 
@@ -18,6 +28,15 @@ s3_client = boto3.client(
     aws_secret_access_key=os.environ["AWS_SECRET_ACCESS_KEY"]
 )
 bucket_name = config["S3_BUCKET_NAME"]
+ALL_ACCOUNTS_FILE_PATH = config["ALL_ACCOUNTS_FILE_PATH"]
+
+UPLOAD_CHUNK_SIZE = 50_000
+PREVIEW_ROWS = 200
+SPOOL_MAX_BYTES = 16 * 1024 * 1024
+AUTO_DETECT_ACCOUNT = "Auto-detect per file"
+HEADER_MATCH_THRESHOLD = 0.5
+MAX_UPLOAD_WORKERS = 8
+WELLS_FARGO_REQUIRED_COLUMNS = {"DATE", "DESCRIPTION", "AMOUNT"}
 
 class FileUploader:
     def __init__(self):
@@ -45,8 +64,7 @@ class FileUploader:
             "STATUS": "Comment2",
         }
 
-        required_new_columns = {"DATE", "DESCRIPTION", "AMOUNT"}
-        if required_new_columns.issubset(normalized_columns):
+        if WELLS_FARGO_REQUIRED_COLUMNS.issubset(normalized_columns):
             prepared_df = df.rename(
                 columns={
                     normalized_columns[source_column]: target_column
@@ -71,6 +89,43 @@ class FileUploader:
         prepared_df.columns = expected_headers
         return prepared_df
 
+    def detect_account_type(self, columns):
+        """
+        Detect the account type of a statement from its header signature.
+
+        An exact match against `config["HEADERS"]` wins, then the best header
+        overlap among accounts with the same column count, provided it reaches
+        HEADER_MATCH_THRESHOLD (a lone same-width account must meet it too), then
+        the new Wells Fargo layout. Returns None when the header is ambiguous or
+        unknown.
+        """
+        normalized_columns = [self._normalize_column_name(column) for column in columns]
+        header_signatures = {
+            account_type: [self._normalize_column_name(header) for header in headers]
+            for account_type, headers in config["HEADERS"].items()
+        }
+
+        for account_type, signature in header_signatures.items():
+            if normalized_columns == signature:
+                return account_type
+
+        candidates = {
+            account_type: len(set(normalized_columns) & set(signature)) / len(signature)
+            for account_type, signature in header_signatures.items()
+            if len(signature) == len(normalized_columns)
+        }
+        ranked = sorted(candidates.items(), key=lambda item: item[1], reverse=True)
+        if (
+            ranked
+            and ranked[0][1] >= HEADER_MATCH_THRESHOLD
+            and (len(ranked) == 1 or ranked[0][1] > ranked[1][1])
+        ):
+            return ranked[0][0]
+
+        if WELLS_FARGO_REQUIRED_COLUMNS.issubset(normalized_columns):
+            return "WellsFargo_Checking"
+        return None
+
     def _prepare_uploaded_dataframe(self, df, account_type):
         if account_type == "WellsFargo_Checking":
             return self._prepare_wells_fargo_dataframe(df)
@@ -107,8 +162,14 @@ class FileUploader:
                     df = pd.read_csv(BytesIO(s3_object["Body"].read()))
                     if df.empty:
                         continue
-                    min_date = pd.to_datetime(df["Transaction_Date"], errors="coerce").dt.date.min()
-                    max_date = pd.to_datetime(df["Transaction_Date"], errors="coerce").dt.date.max()
+                    date_format = s3_object.get("Metadata", {}).get(
+                        DATE_FORMAT_METADATA_KEY
+                    ) or date_format_for_account(account_type)
+                    transaction_dates = parse_date_series(
+                        df["Transaction_Date"], date_format, cache_key=file_key
+                    ).dt.date
+                    min_date = transaction_dates.min()
+                    max_date = transaction_dates.max()
                     num_transactions = len(df)
                     upload_date = s3_object["LastModified"]
                     data.append(
@@ -150,11 +211,9 @@ class FileUploader:
 
     def delete_files(self, file_keys):
         try:
-            for file_key in file_keys:
-                self.transaction_service.delete_source_file(file_key)
-            consolidated_df, edited_df = self.transaction_service.rebuild_all_datasets()
+            consolidated_df, edited_df = self.transaction_service.remove_source_files(file_keys)
             st.success(
-                f"Deleted {len(file_keys)} file(s). Rebuilt datasets with "
+                f"Deleted {len(file_keys)} file(s). Datasets now hold "
                 f"{consolidated_df.shape[0]} consolidated transactions and "
                 f"{edited_df.shape[0]} editable transactions."
             )
@@ -164,70 +223,191 @@ class FileUploader:
         except Exception as e:
             st.error(f"Error deleting file: {e}")
 
-    # Function to save uploaded file with updated headers
-    def save_file(self, df, account_type):            
-        try:
-            df = self._prepare_uploaded_dataframe(df, account_type)
-            st.write(f"Mapped columns: {df.columns.tolist()}")
+    def _iter_uploaded_chunks(self, uploaded_file):
+        """Yield an uploaded statement in row chunks without loading it whole."""
+        uploaded_file.seek(0)
+        if uploaded_file.name.endswith(".csv"):
+            # Read values as text so every chunk is written back exactly as exported,
+            # regardless of how each chunk's dtypes would have been inferred.
+            yield from pd.read_csv(uploaded_file, chunksize=UPLOAD_CHUNK_SIZE, dtype=str)
+        else:
+            yield from iter_excel_chunks(uploaded_file, chunksize=UPLOAD_CHUNK_SIZE)
+
+    def _read_preview(self, uploaded_file):
+        """Read a bounded sample of an uploaded statement for the preview table."""
+        uploaded_file.seek(0)
+        if uploaded_file.name.endswith(".csv"):
+            preview_df = pd.read_csv(uploaded_file, nrows=PREVIEW_ROWS)
+        else:
+            preview_df = next(
+                iter_excel_chunks(uploaded_file, chunksize=PREVIEW_ROWS), pd.DataFrame()
+            )
+        uploaded_file.seek(0)
+        return preview_df
+
+    def _store_chunks(self, chunks, account_type):
+        """
+        Map, validate and upload a statement chunk by chunk.
+
+        Headers are validated on the first chunk, the date range and row count are
+        accumulated as chunks arrive, and the normalized rows are spooled to a
+        temporary file (on disk once it grows large) that is streamed to S3.
+
+        Returns:
+            tuple: The new S3 key, the mapped columns and the number of rows stored.
+        """
+        date_format = None
+        mapped_columns = []
+        min_date = max_date = None
+        row_count = 0
+
+        with tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES, mode="w+b") as buffer:
+            for chunk_index, chunk in enumerate(chunks):
+                prepared_df = self._prepare_uploaded_dataframe(chunk, account_type)
+                if chunk_index == 0:
+                    mapped_columns = prepared_df.columns.tolist()
+                    date_format = resolve_date_format(
+                        prepared_df["Transaction_Date"], date_format_for_account(account_type)
+                    )
+
+                transaction_dates = parse_date_series(
+                    prepared_df["Transaction_Date"], date_format
+                ).dropna()
+                if not transaction_dates.empty:
+                    chunk_min = transaction_dates.min().date()
+                    chunk_max = transaction_dates.max().date()
+                    min_date = chunk_min if min_date is None else min(min_date, chunk_min)
+                    max_date = chunk_max if max_date is None else max(max_date, chunk_max)
+
+                row_count += len(prepared_df)
+                prepared_df.to_csv(buffer, index=False, header=chunk_index == 0)
 
-            # Extract min and max transaction dates
-            min_date = str(pd.to_datetime(df['Transaction_Date']).dt.date.min())
-            max_date = str(pd.to_datetime(df['Transaction_Date']).dt.date.max())
+            if row_count == 0:
+                raise ValueError("The file does not contain any transactions.")
+            if min_date is None:
+                # The S3 key is derived from the date range, so undated files are rejected
+                raise ValueError("None of the transaction dates in the file could be parsed.")
 
             # Create new file name
             new_file_name = f"data/{account_type}/{min_date}_{max_date}.csv"
 
-            # Save cleaned dataframe to new CSV file in memory
-            csv_buffer = BytesIO()
-            df.to_csv(csv_buffer, index=False)
-            csv_buffer.seek(0)
+            # Upload to S3, recording the date format so consolidation can skip inference
+            metadata = {DATE_FORMAT_METADATA_KEY: date_format} if date_format else {}
+            buffer.seek(0)
+            s3_client.upload_fileobj(
+                buffer, bucket_name, new_file_name, ExtraArgs={"Metadata": metadata}
+            )
+        # A re-upload with the same date range replaces the file under the same key
+        forget_statement_date_formats(new_file_name)
+
+        return new_file_name, mapped_columns, row_count
 
-            # Upload to S3
-            s3_client.put_object(Bucket=bucket_name, Key=new_file_name, Body=csv_buffer.getvalue())
+    # Function to save uploaded file with updated headers
+    def save_file(self, df, account_type):
+        try:
+            new_file_name, _, _ = self._store_chunks([df], account_type)
             return new_file_name
         except Exception as e:
             raise RuntimeError(f"Error saving file: {e}") from e
 
+    def save_uploaded_file(self, uploaded_file, account_type):
+        try:
+            return self._store_chunks(self._iter_uploaded_chunks(uploaded_file), account_type)
+        except Exception as e:
+            raise RuntimeError(f"Error saving file: {e}") from e
+
+    def save_uploaded_files(self, file_accounts):
+        """
+        Store several uploaded statements concurrently.
+
+        Parameters:
+        file_accounts (list): Pairs of (uploaded file, account type).
+
+        Returns:
+        tuple: A list of (file name, new S3 key, mapped columns, row count) for saved
+               files and a list of failure messages.
+        """
+        saved_files = []
+        failed_files = []
+        if not file_accounts:
+            return saved_files, failed_files
+
+        max_workers = min(len(file_accounts), MAX_UPLOAD_WORKERS)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                (uploaded_file, executor.submit(self.save_uploaded_file, uploaded_file, account_type))
+                for uploaded_file, account_type in file_accounts
+            ]
+            for uploaded_file, future in futures:
+                try:
+                    new_file_name, mapped_columns, row_count = future.result()
+                    saved_files.append((uploaded_file.name, new_file_name, mapped_columns, row_count))
+                except Exception as exc:
+                    failed_files.append(f"{uploaded_file.name}: {exc}")
+        return saved_files, failed_files
+
     def upload_file(self):
-        account_type = st.selectbox("Select Account Type", self.account_types)
+        account_choice = st.selectbox(
+            "Select Account Type", [AUTO_DETECT_ACCOUNT] + self.account_types
+        )
         uploaded_files = st.file_uploader(
             "Upload CSV or Excel files",
             type=["csv", "xlsx"],
             accept_multiple_files=True,
         )
         if uploaded_files:
-            preview_frames = []
-            parsed_files = []
+            file_accounts = []
+            undetected_files = []
 
+            st.subheader("Preview Files")
+            st.caption(f"Showing up to the first {PREVIEW_ROWS} rows of each file.")
             for uploaded_file in uploaded_files:
-                if uploaded_file.name.endswith(".csv"):
-                    df = pd.read_csv(uploaded_file)
+                preview_df = self._read_preview(uploaded_file)
+                if account_choice == AUTO_DETECT_ACCOUNT:
+                    account_type = self.detect_account_type(preview_df.columns)
                 else:
-                    df = pd.read_excel(uploaded_file)
+                    account_type = account_choice
 
-                preview_df = df.copy()
-                preview_df.insert(0, "Uploaded_File", uploaded_file.name)
-                preview_frames.append(preview_df)
-                parsed_files.append((uploaded_file.name, df))
+                if account_type is None:
+                    undetected_files.append(uploaded_file.name)
+                else:
+                    file_accounts.append((uploaded_file, account_type))
 
-            st.subheader("Preview Files")
-            for preview_df in preview_frames:
+                st.write(f"**{uploaded_file.name}** → {account_type or 'Unknown account'}")
+                preview_df.insert(0, "Uploaded_File", uploaded_file.name)
                 st.dataframe(preview_df, use_container_width=True)
 
-            if st.button("Save Files"):
-                saved_files = 0
-                failed_files = []
+            for file_name in undetected_files:
+                st.warning(
+                    f"Could not detect the account type of {file_name}. "
+                    "Select its account type explicitly to import it."
+                )
+
+            consolidate = st.checkbox(
+                "Add saved files to the consolidated dataset",
+                value=True,
+                help="Consolidate only the newly saved files into the existing dataset.",
+            )
+
+            if st.button("Save Files", disabled=not file_accounts):
+                with st.spinner("Saving files..."):
+                    saved_files, failed_files = self.save_uploaded_files(file_accounts)
 
-                for file_name, df in parsed_files:
-                    try:
-                        new_file_name = self.save_file(df.copy(), account_type)
-                        saved_files += 1
-                        st.success(f"{file_name} saved as {new_file_name}")
-                    except Exception as exc:
-                        failed_files.append(f"{file_name}: {exc}")
+                for file_name, new_file_name, mapped_columns, row_count in saved_files:
+                    st.write(f"Mapped columns: {mapped_columns}")
+                    st.success(f"{file_name} saved as {new_file_name} ({row_count} transactions)")
 
                 if saved_files:
-                    st.success(f"Saved {saved_files} file(s) for {account_type}.")
+                    st.success(f"Saved {len(saved_files)} file(s).")
 
                 for failure in failed_files:
                     st.error(failure)
+
+                if saved_files and consolidate:
+                    with st.spinner("Consolidating new transactions..."):
+                        _, appended_df = self.transaction_service.append_source_files(
+                            [new_file_name for _, new_file_name, _, _ in saved_files]
+                        )
+                    st.success(
+                        f"Added {appended_df.shape[0]} new transaction(s) to {ALL_ACCOUNTS_FILE_PATH}."
+                    )
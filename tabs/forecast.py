@@ -4,11 +4,24 @@ from typing import Optional
 import numpy as np
 import pandas as pd
 import plotly.express as px
+import plotly.graph_objects as go
 import streamlit as st
 
+from tabs.affordability_grid import amortization_schedule, amortized_payments, scenario_grid
+from tabs.cache_utils import frame_fingerprint
+from tabs.chart_utils import cached_figure, line_chart
+from tabs.savings_simulator import simulate_savings
+from tabs.seasonal_forecast import category_history, forecast_categories
+
 
 config = json.load(open("assets/config.json"))
 
+SIMULATION_PATH_OPTIONS = [10_000, 25_000, 50_000, 100_000]
+SCENARIO_DOWN_PAYMENT_PCTS = [0, 5, 10, 15, 20, 25, 30, 40]
+SCENARIO_TERMS = {"mortgage": [10, 15, 20, 30], "car": [3, 4, 5, 6, 7]}
+SCENARIO_PRICE_STEPS = 9
+SCENARIO_RATE_STEP = 0.25
+
 
 class SavingsForecast:
     """Render savings forecasts and life-event affordability insights."""
@@ -26,13 +39,20 @@ class SavingsForecast:
             return
 
         st.subheader("Monthly Savings Overview")
-        self._render_monthly_summary(monthly_summary)
+        category_forecasts = forecast_categories(self.full_df)
+        self._render_monthly_summary(monthly_summary, category_forecasts)
+        self._render_category_forecasts(category_forecasts)
         st.divider()
         st.subheader("Major Life Event Affordability")
         avg_net_savings = monthly_summary["Net_Savings"].mean()
-        self._render_mortgage_affordability(avg_net_savings)
-        self._render_family_planning(avg_net_savings)
-        self._render_second_car_affordability(avg_net_savings)
+        goals = {
+            "Mortgage down payment": self._render_mortgage_affordability(avg_net_savings),
+            "Family cushion (6 months)": self._render_family_planning(avg_net_savings),
+            "Second car down payment": self._render_second_car_affordability(avg_net_savings),
+        }
+        st.divider()
+        st.subheader("Savings Simulation")
+        self._render_savings_simulation(monthly_summary, goals)
 
     def _prepare_monthly_summary(self) -> pd.DataFrame:
         """Aggregate income, expense, and net savings by month."""
@@ -76,7 +96,9 @@ class SavingsForecast:
         )
         return summary.reset_index(drop=True)
 
-    def _render_monthly_summary(self, summary: pd.DataFrame) -> None:
+    def _render_monthly_summary(
+        self, summary: pd.DataFrame, category_forecasts: Optional[pd.DataFrame] = None
+    ) -> None:
         latest_row = summary.iloc[-1]
         last_three_avg = summary["Net_Savings"].tail(3).mean()
 
@@ -123,25 +145,51 @@ class SavingsForecast:
             },
         )
 
-        line_fig = px.line(
-            summary,
-            x="Month",
-            y=["Income", "Expense_Absolute", "Net_Savings"],
-            labels={"value": "Amount ($)", "variable": "Series"},
-            title="Income vs. Expenses vs. Net Savings",
-        )
-        line_fig.update_traces(mode="lines+markers")
-        line_fig.update_layout(legend_title_text="")
-        st.plotly_chart(line_fig, use_container_width=True)
-
-        area_fig = px.area(
-            summary,
-            x="Month",
-            y="Net_Savings",
-            title="Monthly Net Savings Trend",
+        has_projection = category_forecasts is not None and not category_forecasts.empty
+        projected_net = category_forecasts.sum(axis=1) if has_projection else None
+
+        def build_line_fig():
+            line_fig = line_chart(
+                summary,
+                x="Month",
+                y=["Income", "Expense_Absolute", "Net_Savings"],
+                labels={"value": "Amount ($)", "variable": "Series"},
+                title="Income vs. Expenses vs. Net Savings",
+            )
+            line_fig.update_traces(mode="lines+markers")
+            if has_projection:
+                line_fig.add_trace(go.Scatter(
+                    x=projected_net.index,
+                    y=projected_net.to_numpy(),
+                    mode="lines",
+                    line={"dash": "dash"},
+                    name="Projected_Net_Savings",
+                ))
+            line_fig.update_layout(legend_title_text="")
+            return line_fig
+
+        projection_version = frame_fingerprint(projected_net.to_frame()) if has_projection else None
+        st.plotly_chart(
+            cached_figure("forecast_summary", summary, build_line_fig, projection_version),
+            use_container_width=True,
         )
-        area_fig.update_layout(yaxis_title="Net Savings ($)")
-        st.plotly_chart(area_fig, use_container_width=True)
+        if has_projection:
+            st.caption(
+                f"Projected net savings over the next {len(projected_net)} months: "
+                f"${projected_net.sum():,.0f} (seasonal per-category forecasts)."
+            )
+
+        def build_area_fig():
+            area_fig = px.area(
+                summary,
+                x="Month",
+                y="Net_Savings",
+                title="Monthly Net Savings Trend",
+            )
+            area_fig.update_layout(yaxis_title="Net Savings ($)")
+            return area_fig
+
+        st.plotly_chart(cached_figure("forecast_net_area", summary, build_area_fig), use_container_width=True)
 
         if last_three_avg < 0:
             st.error(
@@ -157,7 +205,39 @@ class SavingsForecast:
                 "Savings are stable. Keep automating transfers to savings and look for opportunities to invest excess cash."
             )
 
-    def _render_mortgage_affordability(self, avg_net_savings: float) -> None:
+    def _render_category_forecasts(self, category_forecasts: pd.DataFrame) -> None:
+        if category_forecasts.empty:
+            return
+
+        with st.expander("Category Forecasts"):
+            category = st.selectbox(
+                "Category", sorted(category_forecasts.columns), key="forecast_category"
+            )
+            _, history = category_history(self.full_df)
+            chart_df = pd.concat(
+                [
+                    history[category].rename("Actual"),
+                    category_forecasts[category].rename("Forecast"),
+                ],
+                axis=1,
+            ).rename_axis("Month").reset_index()
+            def build_forecast_fig():
+                forecast_fig = line_chart(
+                    chart_df,
+                    x="Month",
+                    y=["Actual", "Forecast"],
+                    labels={"value": "Amount ($)", "variable": "Series"},
+                    title=f"{category}: 12-Month Forecast",
+                )
+                forecast_fig.update_layout(legend_title_text="")
+                return forecast_fig
+
+            st.plotly_chart(
+                cached_figure("forecast_category", chart_df, build_forecast_fig, category),
+                use_container_width=True,
+            )
+
+    def _render_mortgage_affordability(self, avg_net_savings: float) -> float:
         with st.expander("Mortgage Affordability"):
             home_price = st.number_input(
                 "Target home price ($)", value=350000.0, min_value=0.0, step=5000.0
@@ -193,8 +273,17 @@ class SavingsForecast:
                 avg_net_savings=avg_net_savings,
                 context="mortgage",
             )
+            self._render_scenario_grid(
+                context="mortgage",
+                price=home_price,
+                down_payment=down_payment,
+                rate=interest_rate,
+                term_years=term_years,
+                avg_net_savings=avg_net_savings,
+            )
+        return down_payment
 
-    def _render_family_planning(self, avg_net_savings: float) -> None:
+    def _render_family_planning(self, avg_net_savings: float) -> float:
         with st.expander("Starting or Expanding a Family"):
             childcare = st.number_input(
                 "Monthly childcare or education costs ($)",
@@ -226,8 +315,9 @@ class SavingsForecast:
                 avg_net_savings=avg_net_savings,
                 context="family",
             )
+        return family_total * 6
 
-    def _render_second_car_affordability(self, avg_net_savings: float) -> None:
+    def _render_second_car_affordability(self, avg_net_savings: float) -> float:
         with st.expander("Buying a Second Car"):
             car_price = st.number_input(
                 "Car purchase price ($)", value=38000.0, min_value=0.0, step=1000.0
@@ -270,18 +360,175 @@ class SavingsForecast:
                 avg_net_savings=avg_net_savings,
                 context="car",
             )
+            self._render_scenario_grid(
+                context="car",
+                price=car_price,
+                down_payment=car_down_payment,
+                rate=car_rate,
+                term_years=car_term_years,
+                avg_net_savings=avg_net_savings,
+                extra_monthly_cost=insurance + maintenance,
+            )
+        return car_down_payment
+
+    def _render_scenario_grid(
+        self,
+        *,
+        context: str,
+        price: float,
+        down_payment: float,
+        rate: float,
+        term_years: float,
+        avg_net_savings: float,
+        extra_monthly_cost: float = 0.0,
+    ) -> None:
+        """Explore price x down payment x rate x term scenarios around the entered loan."""
+        if not st.checkbox("Explore scenarios", key=f"{context}_scenarios"):
+            return
+
+        span_col, rate_col, term_col = st.columns(3)
+        price_span = span_col.slider(
+            "Price range (+/- %)", min_value=0, max_value=50, value=20, step=5, key=f"{context}_price_span"
+        )
+        rate_span = rate_col.slider(
+            "Rate range (+/- pts)", min_value=0.0, max_value=4.0, value=2.0, step=0.25, key=f"{context}_rate_span"
+        )
+        terms = term_col.multiselect(
+            "Terms (years)",
+            SCENARIO_TERMS[context],
+            default=SCENARIO_TERMS[context],
+            key=f"{context}_scenario_terms",
+        )
+        if not terms or price <= 0:
+            st.caption("Choose at least one term and a positive price to build scenarios.")
+            return
+
+        # A zero span (or a tiny price) collapses the axis, so drop repeated prices
+        prices = np.unique(
+            np.linspace(price * (1 - price_span / 100), price * (1 + price_span / 100), SCENARIO_PRICE_STEPS).round(0)
+        )
+        rates = np.arange(max(rate - rate_span, 0.0), rate + rate_span + 1e-9, SCENARIO_RATE_STEP)
+        scenarios = scenario_grid(
+            prices,
+            SCENARIO_DOWN_PAYMENT_PCTS,
+            rates,
+            sorted(terms),
+            avg_net_savings,
+            extra_monthly_cost=extra_monthly_cost,
+        )
+        st.caption(f"Evaluated {len(scenarios):,} scenarios.")
+
+        price_col, term_select_col = st.columns(2)
+        if len(prices) > 1:
+            heatmap_price = price_col.select_slider(
+                "Heatmap price ($)",
+                options=prices.tolist(),
+                value=prices.tolist()[len(prices) // 2],
+                key=f"{context}_heatmap_price",
+            )
+        else:
+            heatmap_price = prices[0]
+        heatmap_term = term_select_col.selectbox("Heatmap term (years)", sorted(terms), key=f"{context}_heatmap_term")
+
+        selected = scenarios[
+            np.isclose(scenarios["Price"], heatmap_price)
+            & (scenarios["Term_Years"] == heatmap_term)
+        ]
+        metric = "Monthly_Payment" if avg_net_savings <= 0 else "Affordability_Ratio"
+        heatmap = selected.pivot(index="Down_Payment_Pct", columns="Rate", values=metric)
+        heatmap_fig = px.imshow(
+            heatmap,
+            labels={"x": "Interest rate (%)", "y": "Down payment (%)", "color": metric.replace("_", " ")},
+            color_continuous_scale="RdYlGn_r",
+            aspect="auto",
+            text_auto=".2f" if metric == "Affordability_Ratio" else ".0f",
+            title=f"{metric.replace('_', ' ')} at ${heatmap_price:,.0f} over {heatmap_term} years",
+        )
+        st.plotly_chart(heatmap_fig, use_container_width=True)
+
+        st.write("Amortization schedule for the entered loan")
+        schedule = amortization_schedule(max(price - down_payment, 0.0), rate, term_years)
+        st.dataframe(
+            schedule,
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                column: st.column_config.NumberColumn(column, format="$%0.2f")
+                for column in ["Payment", "Principal", "Interest", "Balance"]
+            },
+        )
+
+    def _render_savings_simulation(self, summary: pd.DataFrame, goals: dict) -> None:
+        """Block-bootstrap historical months into savings paths and chart the outcome range."""
+        if len(summary) < 2:
+            st.info("At least two months of history are needed to simulate savings.")
+            return
+
+        col1, col2, col3, col4 = st.columns(4)
+        horizon = col1.slider(
+            "Horizon (months)", min_value=6, max_value=120, value=36, step=6, key="simulation_horizon"
+        )
+        n_paths = col2.selectbox("Simulated paths", SIMULATION_PATH_OPTIONS, index=0, key="simulation_paths")
+        block_size = col3.number_input(
+            "Block length (months)", value=3, min_value=1, max_value=12, step=1, key="simulation_block"
+        )
+        starting_balance = col4.number_input(
+            "Current savings ($)", value=0.0, step=1000.0, key="simulation_balance"
+        )
+
+        bands, probabilities = simulate_savings(
+            summary["Income"].to_numpy(),
+            summary["Expenses"].to_numpy(),
+            horizon=horizon,
+            n_paths=n_paths,
+            goals=goals,
+            starting_balance=starting_balance,
+            block_size=int(block_size),
+        )
+        bands = bands.copy()
+        first_month = summary["Month"].iloc[-1] + pd.DateOffset(months=1)
+        bands["Month"] = pd.date_range(first_month, periods=horizon, freq="MS")
+
+        def build_band_fig():
+            band_fig = go.Figure()
+            for lower, upper, label in (
+                ("P5", "P95", "5th-95th percentile"),
+                ("P25", "P75", "25th-75th percentile"),
+            ):
+                band_fig.add_trace(go.Scatter(
+                    x=bands["Month"], y=bands[upper], mode="lines", line={"width": 0},
+                    showlegend=False, hoverinfo="skip",
+                ))
+                band_fig.add_trace(go.Scatter(
+                    x=bands["Month"], y=bands[lower], mode="lines", line={"width": 0},
+                    fill="tonexty", name=label,
+                ))
+            band_fig.add_trace(go.Scatter(x=bands["Month"], y=bands["P50"], mode="lines", name="Median"))
+            band_fig.update_layout(
+                title=f"Projected Savings Balance ({n_paths:,} simulated paths)",
+                yaxis_title="Savings ($)",
+            )
+            return band_fig
+
+        st.plotly_chart(cached_figure("forecast_bands", bands, build_band_fig, n_paths), use_container_width=True)
+
+        probabilities["Probability"] = probabilities["Probability"] * 100
+        st.dataframe(
+            probabilities.drop(columns="Horizon_Months"),
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                "Target": st.column_config.NumberColumn("Target ($)", format="$%0.0f"),
+                "Probability": st.column_config.ProgressColumn(
+                    "Chance within horizon", min_value=0.0, max_value=100.0, format="%.0f%%"
+                ),
+                "Median_Months": st.column_config.NumberColumn("Median months to goal", format="%0.0f"),
+            },
+        )
 
     @staticmethod
     def _amortized_payment(principal: float, annual_rate: float, term_years: float) -> float:
-        if principal <= 0:
-            return 0.0
-        months = int(term_years * 12)
-        months = max(months, 1)
-        monthly_rate = annual_rate / 100 / 12
-        if monthly_rate == 0:
-            return principal / months
-        factor = (1 + monthly_rate) ** months
-        return principal * (monthly_rate * factor) / (factor - 1)
+        return float(amortized_payments(principal, annual_rate, term_years))
 
     @staticmethod
     def _affordability_ratio(monthly_cost: float, avg_net_savings: float) -> float:
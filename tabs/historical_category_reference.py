@@ -7,6 +7,9 @@ import os
 from dotenv import load_dotenv
 from tabs.amount_utils import normalize_amount_series
 from tabs.transaction_service import SOURCE_FILE_COLUMN
+from tabs.transaction_fingerprint import TRANSACTION_ID_COLUMN
+from tabs.excel_reader import load_predefined_categories
+from tabs.edit_journal import EditJournal
 load_dotenv()
 
 class HistoricalCategoryReference:
@@ -26,11 +29,10 @@ class HistoricalCategoryReference:
         self.all_accounts_edited_file = config["ALL_ACCOUNTS_EDITED_FILE_PATH"]
         self.REPLACEMENT_DICT = config["REPLACEMENT_DICT"]
         self.all_accounts_df = self.read_csv_from_s3(self.all_accounts_file)
-        self.all_accounts_edited_df = self.read_csv_from_s3(self.all_accounts_edited_file)
+        self.all_accounts_edited_df = EditJournal().apply(self.read_csv_from_s3(self.all_accounts_edited_file))
         self.df = None
         categories_file_path = config["CATEGORIES_FILE_PATH"]
-        categories_df = pd.read_excel(categories_file_path)
-        self.predefined_categories = sorted(categories_df['Custom Categories'].unique().tolist())
+        self.predefined_categories = load_predefined_categories(categories_file_path)
 
     def read_csv_from_s3(self, s3_key):
         """
@@ -155,6 +157,12 @@ class HistoricalCategoryReference:
 
         transaction_match_columns = ['Transaction_Date', 'Account_Type', 'Description', 'Amount']
         if (
+            TRANSACTION_ID_COLUMN in self.all_accounts_df.columns
+            and TRANSACTION_ID_COLUMN in self.all_accounts_edited_df.columns
+        ):
+            # Both datasets carry the stable transaction ID, so one int64 key is enough
+            transaction_match_columns = [TRANSACTION_ID_COLUMN]
+        elif (
             SOURCE_FILE_COLUMN in self.all_accounts_df.columns
             and SOURCE_FILE_COLUMN in self.all_accounts_edited_df.columns
         ):
@@ -0,0 +1,224 @@
+import json
+import os
+from io import BytesIO
+
+import boto3
+import numpy as np
+import pandas as pd
+from botocore.exceptions import ClientError
+from dotenv import load_dotenv
+
+from tabs.amount_utils import normalize_amount_series
+from tabs.cache_utils import LRUCache
+from tabs.transaction_fingerprint import canonical_merchant
+
+load_dotenv()
+
+config = json.load(open("assets/config.json"))
+
+s3 = boto3.client(
+    "s3",
+    aws_access_key_id=os.environ["AWS_ACCESS_KEY_ID"],
+    aws_secret_access_key=os.environ["AWS_SECRET_ACCESS_KEY"],
+)
+
+bucket_name = config["S3_BUCKET_NAME"]
+RECURRING_CHARGES_PATH = config["RECURRING_CHARGES_PATH"]
+EXCLUDED_CATEGORIES = config["EXCLUDED_CATEGORIES"]
+
+# Charges from one merchant within this relative amount step belong to the same
+# series, so a price increase does not split a subscription in two.
+AMOUNT_TOLERANCE = 0.25
+# Share of gaps that must fall inside the cadence window.
+MIN_REGULARITY = 0.7
+CADENCES = pd.DataFrame(
+    {
+        "Cadence": ["Weekly", "Biweekly", "Monthly", "Quarterly", "Annual"],
+        "Min_Gap": [6, 13, 26, 85, 350],
+        "Max_Gap": [8, 16, 35, 96, 380],
+        "Min_Occurrences": [4, 3, 3, 3, 2],
+        "Offset": [
+            pd.DateOffset(weeks=1),
+            pd.DateOffset(weeks=2),
+            pd.DateOffset(months=1),
+            pd.DateOffset(months=3),
+            pd.DateOffset(years=1),
+        ],
+    }
+)
+RECURRING_COLUMNS = [
+    "Merchant",
+    "Account_Type",
+    "Cadence",
+    "Occurrences",
+    "First_Date",
+    "Last_Date",
+    "Next_Date",
+    "Expected_Amount",
+    "Monthly_Cost",
+    "Previous_Amount",
+    "Price_Changes",
+    "Last_Price_Change",
+]
+
+_recurring_cache = LRUCache(maxsize=4)
+
+
+def _charges(df):
+    """Return outflows with their merchant key, date and positive amount."""
+    amounts = normalize_amount_series(df["Amount"])
+    mask = (amounts < 0) & ~df["Category"].isin(EXCLUDED_CATEGORIES)
+    charges = pd.DataFrame(
+        {
+            "Merchant": canonical_merchant(df.loc[mask, "Description"]),
+            "Account_Type": df.loc[mask, "Account_Type"].astype(str),
+            "Transaction_Date": pd.to_datetime(
+                df.loc[mask, "Transaction_Date"], format="mixed", errors="coerce"
+            ),
+            "Amount": -amounts[mask],
+        }
+    )
+    return charges[charges["Transaction_Date"].notna() & charges["Merchant"].ne("")]
+
+
+def detect_recurring_charges(df):
+    """
+    Find recurring charges in one grouped pass.
+
+    Charges are split into series by merchant and account, then by amount: after
+    sorting by amount, a step of more than AMOUNT_TOLERANCE starts a new series.
+    Each series is sorted by date and its inter-arrival gaps are summarized with
+    grouped diff statistics; the median gap selects the cadence, and a series is
+    kept when enough of its gaps fall inside that cadence's window.
+
+    Returns:
+        pd.DataFrame: One row per recurring series in RECURRING_COLUMNS layout.
+    """
+    charges = _charges(df)
+    if charges.empty:
+        return pd.DataFrame(columns=RECURRING_COLUMNS)
+
+    # Amount-tolerance series within each merchant and account
+    charges = charges.sort_values(["Merchant", "Account_Type", "Amount"], kind="mergesort")
+    new_merchant = (
+        charges["Merchant"].ne(charges["Merchant"].shift())
+        | charges["Account_Type"].ne(charges["Account_Type"].shift())
+    )
+    amount_step = charges["Amount"] / charges["Amount"].shift() - 1
+    new_series = new_merchant.to_numpy(dtype=bool) | (amount_step > AMOUNT_TOLERANCE).to_numpy()
+    charges["Series"] = np.cumsum(new_series)
+
+    # Inter-arrival gaps within each series
+    charges = charges.sort_values(["Series", "Transaction_Date"], kind="mergesort")
+    grouped = charges.groupby("Series", sort=False)
+    charges["Gap"] = grouped["Transaction_Date"].diff().dt.days
+    charges["Price_Step"] = grouped["Amount"].diff().round(2)
+
+    series = grouped.agg(
+        Merchant=("Merchant", "first"),
+        Account_Type=("Account_Type", "first"),
+        Occurrences=("Amount", "size"),
+        First_Date=("Transaction_Date", "first"),
+        Last_Date=("Transaction_Date", "last"),
+        Expected_Amount=("Amount", "last"),
+        Median_Gap=("Gap", "median"),
+    )
+    series = series[series["Occurrences"] >= CADENCES["Min_Occurrences"].min()]
+    if series.empty:
+        return pd.DataFrame(columns=RECURRING_COLUMNS)
+
+    # Cadence from the median gap
+    cadence_index = np.searchsorted(CADENCES["Max_Gap"].to_numpy(), series["Median_Gap"].to_numpy())
+    cadence_index = np.minimum(cadence_index, len(CADENCES) - 1)
+    cadence = CADENCES.iloc[cadence_index].set_index(series.index)
+    in_window = (series["Median_Gap"] >= cadence["Min_Gap"]) & (
+        series["Median_Gap"] <= cadence["Max_Gap"]
+    )
+    series = series.assign(
+        Cadence=cadence["Cadence"],
+        Min_Gap=cadence["Min_Gap"],
+        Max_Gap=cadence["Max_Gap"],
+        Offset=cadence["Offset"],
+    )[in_window & (series["Occurrences"] >= cadence["Min_Occurrences"])]
+    if series.empty:
+        return pd.DataFrame(columns=RECURRING_COLUMNS)
+
+    # Regularity: share of gaps inside the cadence window
+    gaps = charges[["Series", "Gap"]].dropna().join(series[["Min_Gap", "Max_Gap"]], on="Series", how="inner")
+    regular = gaps["Gap"].between(gaps["Min_Gap"], gaps["Max_Gap"]).groupby(gaps["Series"]).mean()
+    series = series[regular.reindex(series.index).fillna(0) >= MIN_REGULARITY]
+    if series.empty:
+        return pd.DataFrame(columns=RECURRING_COLUMNS)
+
+    # Price changes between consecutive charges
+    steps = charges.loc[charges["Series"].isin(series.index) & charges["Price_Step"].fillna(0).ne(0)]
+    step_groups = steps.groupby("Series")
+    series["Price_Changes"] = step_groups.size().reindex(series.index).fillna(0).astype(int)
+    series["Last_Price_Change"] = step_groups["Transaction_Date"].last().reindex(series.index)
+    series["Previous_Amount"] = (
+        (series["Expected_Amount"] - step_groups["Price_Step"].last().reindex(series.index))
+        .where(series["Price_Changes"] > 0)
+        .round(2)
+    )
+
+    series["Next_Date"] = [
+        last_date + offset for last_date, offset in zip(series["Last_Date"], series["Offset"])
+    ]
+    series["Monthly_Cost"] = (series["Expected_Amount"] * 30.44 / series["Median_Gap"]).round(2)
+    series["Expected_Amount"] = series["Expected_Amount"].round(2)
+    return series[RECURRING_COLUMNS].sort_values(
+        ["Monthly_Cost", "Merchant"], ascending=[False, True]
+    ).reset_index(drop=True)
+
+
+class RecurringDetector:
+    """Persisted recurring-charge results, refreshed per merchant as statements arrive."""
+
+    def __init__(self, results_path=RECURRING_CHARGES_PATH):
+        self.results_path = results_path
+
+    def load(self):
+        """Return the stored recurring charges, cached by the object's ETag."""
+        try:
+            version = s3.head_object(Bucket=bucket_name, Key=self.results_path)["ETag"]
+        except ClientError:
+            return pd.DataFrame(columns=RECURRING_COLUMNS)
+        results = _recurring_cache.get(version)
+        if results is None:
+            obj = s3.get_object(Bucket=bucket_name, Key=self.results_path)
+            results = pd.read_csv(
+                BytesIO(obj["Body"].read()),
+                parse_dates=["First_Date", "Last_Date", "Next_Date", "Last_Price_Change"],
+            )
+            results = _recurring_cache.put(version, results)
+        return results
+
+    def save(self, results):
+        s3.put_object(Bucket=bucket_name, Key=self.results_path, Body=results.to_csv(index=False))
+
+    def rebuild(self, df):
+        """Detect recurring charges over the full history and store them."""
+        results = detect_recurring_charges(df)
+        self.save(results)
+        return results
+
+    def update(self, df, new_df):
+        """
+        Refresh only the merchants that appear in newly consolidated rows.
+
+        Parameters:
+            df (pd.DataFrame): The full consolidated dataset, including `new_df`.
+            new_df (pd.DataFrame): The rows just appended.
+        """
+        if new_df.empty:
+            return self.load()
+
+        affected = set(canonical_merchant(new_df["Description"]).dropna())
+        merchants = canonical_merchant(df["Description"])
+        refreshed = detect_recurring_charges(df[merchants.isin(affected)])
+        stored = self.load()
+        results = pd.concat(
+            [stored[~stored["Merchant"].isin(affected)], refreshed], ignore_index=True
+        ).sort_values(["Monthly_Cost", "Merchant"], ascending=[False, True])
+        self.save(results)
+        return results
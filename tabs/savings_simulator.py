@@ -0,0 +1,153 @@
+import hashlib
+from typing import Dict, Sequence
+
+import numpy as np
+import pandas as pd
+
+from tabs.cache_utils import LRUCache
+
+PERCENTILES = (5, 25, 50, 75, 95)
+DEFAULT_BLOCK_SIZE = 3
+DEFAULT_SEED = 2024
+
+_simulation_cache = LRUCache(maxsize=2)
+_band_cache = LRUCache(maxsize=16)
+
+
+def _history_key(income: np.ndarray, expenses: np.ndarray) -> str:
+    digest = hashlib.sha1(np.ascontiguousarray(income, dtype=np.float64).tobytes())
+    digest.update(np.ascontiguousarray(expenses, dtype=np.float64).tobytes())
+    return digest.hexdigest()
+
+
+def block_bootstrap_indices(
+    history_length: int, horizon: int, n_paths: int, block_size: int, rng: np.random.Generator
+) -> np.ndarray:
+    """
+    Draw month indices for `n_paths` block-bootstrapped paths of `horizon` months.
+
+    Each path is stitched from random runs of `block_size` consecutive historical
+    months, which keeps seasonality and month-to-month correlation inside a block.
+    """
+    block_size = max(1, min(block_size, history_length))
+    n_blocks = -(-horizon // block_size)
+    starts = rng.integers(
+        0, history_length - block_size + 1, size=(n_paths, n_blocks), dtype=np.int32
+    )
+    indices = starts[:, :, None] + np.arange(block_size, dtype=np.int32)
+    return indices.reshape(n_paths, n_blocks * block_size)[:, :horizon]
+
+
+def _simulation_key(income, expenses, horizon, n_paths, starting_balance, block_size, seed):
+    return (
+        _history_key(income, expenses),
+        horizon,
+        n_paths,
+        float(starting_balance),
+        block_size,
+        seed,
+    )
+
+
+def simulate_savings_paths(
+    income: Sequence[float],
+    expenses: Sequence[float],
+    horizon: int,
+    n_paths: int,
+    starting_balance: float = 0.0,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+    seed: int = DEFAULT_SEED,
+) -> np.ndarray:
+    """
+    Simulate cumulative savings balances.
+
+    Parameters:
+    income (array-like): Historical monthly income, oldest first.
+    expenses (array-like): Historical monthly expenses (negative), aligned with `income`.
+    horizon (int): Number of months to simulate.
+    n_paths (int): Number of simulated paths.
+    starting_balance (float): Savings on hand before the first simulated month.
+
+    Returns:
+    np.ndarray: A float32 array of shape (n_paths, horizon) with the balance after each month.
+    Results are cached on the history and parameters, and a fixed seed keeps them stable
+    across reruns.
+    """
+    income = np.asarray(income, dtype=np.float64)
+    expenses = np.asarray(expenses, dtype=np.float64)
+    cache_key = _simulation_key(
+        income, expenses, horizon, n_paths, starting_balance, block_size, seed
+    )
+    cached = _simulation_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    rng = np.random.default_rng(seed)
+    indices = block_bootstrap_indices(len(income), horizon, n_paths, block_size, rng)
+    net_savings = (income + expenses).astype(np.float32)
+    balances = net_savings[indices]
+    del indices
+    np.cumsum(balances, axis=1, out=balances)
+    balances += np.float32(starting_balance)
+    return _simulation_cache.put(cache_key, balances)
+
+
+def percentile_bands(balances: np.ndarray, percentiles: Sequence[int] = PERCENTILES) -> pd.DataFrame:
+    """Return the balance percentiles for each simulated month."""
+    bands = np.percentile(np.ascontiguousarray(balances.T), percentiles, axis=1)
+    result = pd.DataFrame(bands.T, columns=[f"P{p}" for p in percentiles])
+    result.insert(0, "Month_Offset", np.arange(1, balances.shape[1] + 1))
+    return result
+
+
+def goal_probabilities(balances: np.ndarray, goals: Dict[str, float]) -> pd.DataFrame:
+    """
+    Return, per goal, the probability that savings reach its amount within the horizon
+    and the median month in which paths that reach it first do so.
+    """
+    horizon = balances.shape[1]
+    rows = []
+    for goal, amount in goals.items():
+        reached = balances >= amount
+        hit = reached.any(axis=1)
+        first_month = np.argmax(reached, axis=1) + 1
+        rows.append({
+            "Goal": goal,
+            "Target": amount,
+            "Probability": hit.mean(),
+            "Median_Months": float(np.median(first_month[hit])) if hit.any() else np.nan,
+            "Horizon_Months": horizon,
+        })
+    return pd.DataFrame(rows)
+
+
+def simulate_savings(
+    income: Sequence[float],
+    expenses: Sequence[float],
+    horizon: int,
+    n_paths: int,
+    goals: Dict[str, float],
+    starting_balance: float = 0.0,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+    seed: int = DEFAULT_SEED,
+):
+    """
+    Run the simulation and summarize it.
+
+    Returns:
+    tuple: The percentile bands per month and the goal probabilities. Bands are cached
+    with the simulation parameters, so changing only a goal amount reuses both the
+    cached paths and the bands.
+    """
+    income = np.asarray(income, dtype=np.float64)
+    expenses = np.asarray(expenses, dtype=np.float64)
+    cache_key = _simulation_key(
+        income, expenses, horizon, n_paths, starting_balance, block_size, seed
+    )
+    balances = simulate_savings_paths(
+        income, expenses, horizon, n_paths, starting_balance, block_size, seed
+    )
+    bands = _band_cache.get(cache_key)
+    if bands is None:
+        bands = _band_cache.put(cache_key, percentile_bands(balances))
+    return bands, goal_probabilities(balances, goals)
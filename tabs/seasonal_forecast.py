@@ -0,0 +1,146 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+
+from tabs.cache_utils import LRUCache, frame_fingerprint
+
+SEASON_LENGTH = 12
+FORECAST_HORIZON = 12
+ALPHAS = (0.1, 0.3, 0.5, 0.7)
+BETAS = (0.0, 0.1, 0.2)
+GAMMAS = (0.1, 0.3, 0.5)
+DAMPINGS = (0.85, 0.95)
+
+_history_cache = LRUCache(maxsize=8)
+_forecast_cache = LRUCache(maxsize=8)
+
+
+def monthly_category_matrix(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Return signed monthly totals as a gap-free Month x Category grid.
+
+    The current calendar month is left out while it is still in progress so a
+    partial month does not drag the fitted level down.
+    """
+    dates = pd.to_datetime(df["Transaction_Date"], format="mixed", errors="coerce")
+    valid = dates.notna()
+    months = dates[valid].dt.to_period("M").dt.start_time.rename("Month")
+    grid = (
+        df.loc[valid]
+        .groupby([months, df.loc[valid, "Category"].astype(str)])["Amount"]
+        .sum()
+        .unstack("Category")
+    )
+    if grid.empty:
+        return grid
+
+    current_month = pd.Timestamp.now().to_period("M").start_time
+    grid = grid[grid.index < current_month]
+    if grid.empty:
+        return grid
+    month_index = pd.date_range(grid.index.min(), grid.index.max(), freq="MS", name="Month")
+    return grid.reindex(month_index).fillna(0.0)
+
+
+def category_history(df: pd.DataFrame):
+    """Return the dataset fingerprint and its cached monthly category grid."""
+    fingerprint = frame_fingerprint(df, ["Transaction_Date", "Category", "Amount"])
+    history = _history_cache.get(fingerprint)
+    if history is None:
+        history = _history_cache.put(fingerprint, monthly_category_matrix(df))
+    return fingerprint, history
+
+
+def _parameter_grid(seasonal: bool) -> np.ndarray:
+    gammas = GAMMAS if seasonal else (0.0,)
+    return np.array(list(itertools.product(ALPHAS, BETAS, gammas, DAMPINGS)))
+
+
+def holt_winters_batch(values: np.ndarray, horizon: int = FORECAST_HORIZON, season: int = SEASON_LENGTH):
+    """
+    Fit additive damped Holt-Winters models to every column of `values` at once.
+
+    All categories and all smoothing-parameter candidates are updated together
+    as (parameters x categories) arrays, so the only Python loop is over the
+    months of history. The candidate with the lowest one-step-ahead squared
+    error is kept per category. With fewer than two full seasons of history
+    the seasonal component is disabled (damped Holt's linear trend).
+
+    Parameters:
+    values (np.ndarray): History of shape (months, categories), oldest first.
+
+    Returns:
+    tuple: Forecasts of shape (horizon, categories) and the chosen
+    (alpha, beta, gamma, phi) per category with shape (categories, 4).
+    """
+    n_months, n_series = values.shape
+    seasonal = n_months >= 2 * season
+    params = _parameter_grid(seasonal)
+    alpha, beta, gamma, phi = (params[:, i, None] for i in range(4))
+    n_params = len(params)
+
+    if seasonal:
+        first, second = values[:season], values[season:2 * season]
+        level = np.broadcast_to(first.mean(axis=0), (n_params, n_series)).copy()
+        trend = np.broadcast_to(
+            (second.mean(axis=0) - first.mean(axis=0)) / season, (n_params, n_series)
+        ).copy()
+        seasonals = np.broadcast_to(
+            first - first.mean(axis=0), (n_params, season, n_series)
+        ).copy()
+    else:
+        level = np.broadcast_to(values[0], (n_params, n_series)).copy()
+        trend = np.zeros((n_params, n_series))
+        seasonals = np.zeros((n_params, season, n_series))
+
+    sse = np.zeros((n_params, n_series))
+    for t in range(n_months):
+        observed = values[t]
+        season_index = t % season
+        previous_season = seasonals[:, season_index]
+        prediction = level + phi * trend + previous_season
+        sse += (observed - prediction) ** 2
+
+        previous_level = level
+        level = alpha * (observed - previous_season) + (1 - alpha) * (previous_level + phi * trend)
+        trend = beta * (level - previous_level) + (1 - beta) * phi * trend
+        seasonals[:, season_index] = gamma * (observed - level) + (1 - gamma) * previous_season
+
+    best = np.argmin(sse, axis=0)
+    columns = np.arange(n_series)
+    level, trend, phi_best = level[best, columns], trend[best, columns], phi[best, 0]
+    seasonals = seasonals[best, :, columns].T
+
+    steps = np.arange(1, horizon + 1)[:, None]
+    damped_steps = np.cumsum(phi_best[None, :] ** steps, axis=0)
+    season_positions = (n_months + steps[:, 0] - 1) % season
+    forecasts = level + damped_steps * trend + seasonals[season_positions]
+    return forecasts, params[best]
+
+
+def forecast_categories(df: pd.DataFrame, horizon: int = FORECAST_HORIZON) -> pd.DataFrame:
+    """
+    Forecast signed monthly totals per category.
+
+    Fits are cached per dataset fingerprint, so Streamlit reruns only re-plot.
+
+    Returns:
+    pd.DataFrame: A Month x Category grid of forecasts for the next `horizon` months,
+    or an empty frame when there are fewer than three months of history.
+    """
+    fingerprint, history = category_history(df)
+    cache_key = (fingerprint, horizon)
+    cached = _forecast_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    if len(history) < 3:
+        return _forecast_cache.put(cache_key, pd.DataFrame())
+
+    forecasts, _ = holt_winters_batch(history.to_numpy(dtype=np.float64), horizon=horizon)
+    forecast_index = pd.date_range(
+        history.index[-1] + pd.DateOffset(months=1), periods=horizon, freq="MS", name="Month"
+    )
+    result = pd.DataFrame(forecasts, index=forecast_index, columns=history.columns)
+    return _forecast_cache.put(cache_key, result)
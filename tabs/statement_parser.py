@@ -0,0 +1,201 @@
+import json
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from tabs.amount_utils import normalize_amount_series
+from tabs.date_utils import (
+    date_format_for_account,
+    forget_detected_format,
+    parse_date_series,
+    parse_dates_with_format,
+    resolve_date_format,
+)
+
+config = json.load(open("assets/config.json"))
+
+output_headers = config["OUTPUT_HEADERS"]
+amount_negative_accounts = config["AMOUNT_NEGATIVE_ACCOUNTS"]
+
+SOURCE_FILE_COLUMN = "Source_File"
+TRANSACTION_SORT_COLUMNS = ["Transaction_Date", "Description", "Amount"]
+TRANSACTION_SORT_ASCENDING = [False, True, True]
+DATE_COLUMNS = ["Transaction_Date", "Post_Date"]
+
+
+def account_type_from_path(file_path):
+    """Return the account type encoded in a `data/<account>/<file>.csv` key."""
+    return file_path.split("/")[-2]
+
+
+def _dense_ranks(series, to_sortable, descending=False):
+    """
+    Rank a column by value, missing values last.
+
+    Only the distinct values are converted and sorted; rows take their rank
+    through the factorized codes.
+    """
+    codes, uniques = pd.factorize(series)
+    sortable = to_sortable(uniques)
+    missing = pd.isna(sortable)
+    _, unique_ranks = np.unique(sortable[~missing], return_inverse=True)
+    rank_count = int(unique_ranks.max()) + 1 if len(unique_ranks) else 0
+    if descending:
+        unique_ranks = rank_count - 1 - unique_ranks
+    lookup = np.full(len(uniques) + 1, rank_count, dtype=np.int64)
+    lookup[:-1][~missing] = unique_ranks
+    # Code -1 (missing in the column itself) picks the trailing "last" slot
+    return lookup[codes], rank_count + 1
+
+
+def transaction_sort_key(df):
+    """
+    Return one int64 key per row whose order is the output order.
+
+    Transaction_Date (descending), Description and Amount are each reduced to a
+    dense rank and packed into a single integer, so the frame sorts with a single
+    column stable sort.
+    """
+    date_ranks, date_count = _dense_ranks(
+        df["Transaction_Date"],
+        lambda values: pd.to_datetime(pd.Series(values), errors="coerce").to_numpy(dtype="datetime64[ns]"),
+        descending=True,
+    )
+    description_ranks, description_count = _dense_ranks(
+        df["Description"], lambda values: pd.Series(values).astype(str).to_numpy(dtype=object)
+    )
+    amount_ranks, amount_count = _dense_ranks(
+        df["Amount"], lambda values: pd.to_numeric(pd.Series(values), errors="coerce").to_numpy(dtype=float)
+    )
+    if date_count * description_count * amount_count >= np.iinfo(np.int64).max:
+        return None
+    return (date_ranks * description_count + description_ranks) * amount_count + amount_ranks
+
+
+def sort_transactions(df):
+    """
+    Sort transactions in output order with a stable sort on one packed key.
+
+    NumPy's stable sort on an integer key is a timsort, which detects presorted
+    runs and merges them, so concatenated per-file frames that were each sorted
+    beforehand are merged rather than sorted from scratch.
+    """
+    if df.empty:
+        return df
+    key = transaction_sort_key(df)
+    if key is None:
+        # The packed key would overflow; fall back to a multi-key sort
+        return df.sort_values(
+            by=TRANSACTION_SORT_COLUMNS,
+            ascending=TRANSACTION_SORT_ASCENDING,
+            kind="mergesort",
+        )
+    return df.iloc[np.argsort(key, kind="stable")]
+
+
+def resolve_statement_date_format(df, file_path):
+    """Detect the Transaction_Date format of a file without a recorded format."""
+    return resolve_date_format(
+        df["Transaction_Date"],
+        date_format_for_account(account_type_from_path(file_path)),
+        cache_key=file_path,
+    )
+
+
+def forget_statement_date_formats(file_path):
+    """Drop the date formats detected for a stored file that was replaced or removed."""
+    forget_detected_format(file_path)
+    for column in DATE_COLUMNS:
+        forget_detected_format(f"{file_path}:{column}")
+
+
+def prepare_statement_frame(df, file_path, date_format=None, date_format_resolved=False):
+    """
+    Normalize one stored statement file into the consolidated layout.
+
+    Dates are parsed with `date_format` (usually recorded in the file's metadata)
+    or the account's registered format, and inferred only if neither fits. When
+    `date_format_resolved` is set, `date_format` was just validated by
+    `resolve_statement_date_format` and Transaction_Date is parsed with it as is.
+    """
+    account_type = account_type_from_path(file_path)
+    date_format = date_format or date_format_for_account(account_type)
+    prepared_df = df.copy()
+    prepared_df["Account_Type"] = account_type
+    prepared_df[SOURCE_FILE_COLUMN] = file_path
+
+    prepared_df["Amount"] = normalize_amount_series(prepared_df["Amount"])
+
+    if account_type in amount_negative_accounts:
+        prepared_df["Amount"] = prepared_df["Amount"] * -1
+
+    prepared_df["Amount"] = prepared_df["Amount"].round(2)
+
+    for header in output_headers + [SOURCE_FILE_COLUMN]:
+        if header not in prepared_df.columns:
+            prepared_df[header] = pd.NA
+
+    for column in DATE_COLUMNS:
+        if date_format_resolved and column == "Transaction_Date":
+            parsed = parse_dates_with_format(prepared_df[column], date_format)
+        else:
+            parsed = parse_date_series(
+                prepared_df[column], date_format, cache_key=f"{file_path}:{column}"
+            )
+        prepared_df[column] = parsed.dt.date
+
+    ordered_columns = output_headers + [SOURCE_FILE_COLUMN]
+    remaining_columns = [
+        column for column in prepared_df.columns if column not in ordered_columns
+    ]
+    return prepared_df[ordered_columns + remaining_columns]
+
+
+def frame_to_arrow(df):
+    """Serialize a DataFrame into an Arrow IPC stream."""
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def frame_from_arrow(payload):
+    """Rebuild a DataFrame returned by `parse_statement_bytes`."""
+    if isinstance(payload, pd.DataFrame):
+        return payload
+    return pa.ipc.open_stream(payload).read_all().to_pandas()
+
+
+def parse_statement_bytes(file_path, raw_bytes, date_format=None):
+    """
+    Parse and prepare one raw statement file inside a worker process.
+
+    The frame comes back as an Arrow IPC buffer so the parent receives whole
+    columns instead of pickled Python objects. Frames Arrow cannot represent
+    (mixed-type object columns) are returned as-is.
+
+    Returns:
+        tuple: The payload and the date format detected for a file without a
+        recorded one (None otherwise), or None for empty files.
+    """
+    try:
+        df = pd.read_csv(BytesIO(raw_bytes))
+    except pd.errors.EmptyDataError:
+        return None
+    if df.empty:
+        return None
+
+    detected_format = None
+    if date_format is None:
+        detected_format = resolve_statement_date_format(df, file_path)
+        prepared_df = prepare_statement_frame(df, file_path, detected_format, date_format_resolved=True)
+    else:
+        prepared_df = prepare_statement_frame(df, file_path, date_format)
+    prepared_df = sort_transactions(prepared_df)
+    try:
+        return frame_to_arrow(prepared_df), detected_format
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return prepared_df, detected_format
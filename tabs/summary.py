@@ -2,6 +2,7 @@
 import streamlit as st
 import json
 import plotly.express as px
+from tabs.chart_utils import cached_figure
 
 config = json.load(open("assets/config.json"))
 
@@ -34,9 +35,12 @@ class Summary:
         summary = summary[summary >= 0]
 
         # Create pie chart using Plotly
-        fig = px.pie(summary, values=summary.values, names=summary.index, title='Income vs. Expenses Breakdown', hole=0.4)
-        fig.update_traces(textinfo='label+percent', hovertemplate='Type: %{label}<br>Amount: %{value}<extra></extra>')
-        st.plotly_chart(fig, use_container_width=True)
+        def build_summary_pie():
+            fig = px.pie(summary, values=summary.values, names=summary.index, title='Income vs. Expenses Breakdown', hole=0.4)
+            fig.update_traces(textinfo='label+percent', hovertemplate='Type: %{label}<br>Amount: %{value}<extra></extra>')
+            return fig
+
+        st.plotly_chart(cached_figure("summary_types", summary, build_summary_pie), use_container_width=True)
 
         # Step 2: Needs, Wants, and Savings Breakdown (Pie Charts)
         needs_summary = summary_df[summary_df['Type'] == 'Needs'].groupby('Category')['Amount'].sum().abs()
@@ -44,9 +48,9 @@ class Summary:
         savings_summary = summary_df[summary_df['Type'] == 'Savings'].groupby('Category')['Amount'].sum().abs()
 
         # Create pie charts using Plotly
-        fig_needs = px.pie(needs_summary, values=needs_summary.values, names=needs_summary.index, title='Needs Breakdown', hole=0.4)
-        fig_wants = px.pie(wants_summary, values=wants_summary.values, names=wants_summary.index, title='Wants Breakdown', hole=0.4)
-        fig_savings = px.pie(savings_summary, values=savings_summary.values, names=savings_summary.index, title='Savings Breakdown', hole=0.4)
+        fig_needs = cached_figure("summary_needs", needs_summary, lambda: px.pie(needs_summary, values=needs_summary.values, names=needs_summary.index, title='Needs Breakdown', hole=0.4))
+        fig_wants = cached_figure("summary_wants", wants_summary, lambda: px.pie(wants_summary, values=wants_summary.values, names=wants_summary.index, title='Wants Breakdown', hole=0.4))
+        fig_savings = cached_figure("summary_savings", savings_summary, lambda: px.pie(savings_summary, values=savings_summary.values, names=savings_summary.index, title='Savings Breakdown', hole=0.4))
 
         # Display the charts in the same row
         col1, col2, col3 = st.columns(3)
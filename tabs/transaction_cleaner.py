@@ -74,21 +74,39 @@ class TransactionCleaner:
         df.to_csv(csv_buffer, index=False)
         s3.put_object(Bucket=bucket_name, Key=file_path, Body=csv_buffer.getvalue())
 
-    def consolidate_transactions(self, selected_files):
+    def consolidate_transactions(self, selected_files, parallel=False):
         """
         Consolidates transactions from multiple files into a single DataFrame.
         Args:
             selected_files (list): List of file paths to be consolidated.
+            parallel (bool): Parse the files across a process pool. Defaults to False.
         Returns:
             None
         """
-        all_data = self.transaction_service.consolidate_transactions(selected_files)
+        all_data = self.transaction_service.consolidate_transactions(
+            selected_files, parallel=parallel
+        )
+
+        duplicate_report = self.transaction_service.duplicate_report
+        if not duplicate_report.empty:
+            st.warning(
+                f"Skipped {int(duplicate_report['Duplicate_Transactions'].sum())} duplicate "
+                "transaction(s) found in overlapping files:"
+            )
+            st.dataframe(duplicate_report, use_container_width=True)
 
         st.write("Consolidated Data:")
         st.dataframe(all_data)
 
         self.save_s3_file(all_data, ALL_ACCOUNTS_FILE_PATH)
         st.success(f"{all_data.shape[0]} Transactions consolidated successfully & saved as {ALL_ACCOUNTS_FILE_PATH}!")
+
+        anomaly_flags = self.transaction_service.anomaly_detector.rebuild(all_data)
+        if not anomaly_flags.empty:
+            st.info(f"Flagged {len(anomaly_flags)} unusually large transaction(s); see the Expense Analysis tab.")
+        recurring = self.transaction_service.recurring_detector.rebuild(all_data)
+        if not recurring.empty:
+            st.info(f"Detected {len(recurring)} recurring charge(s); see the Expense Analysis tab.")
         
     # Streamlit app
     def main(self):
@@ -105,9 +123,15 @@ class TransactionCleaner:
                 default=file_list if st.checkbox("Select All") else []
             )
 
+            parallel = st.checkbox(
+                "Parse files in parallel",
+                value=len(selected_files) > 1,
+                help="Use every CPU core to parse the selected files. Recommended for large backfills.",
+            )
+
             if st.button("Consolidate Transactions"):
                 with st.spinner("Consolidating transactions..."):
-                    self.consolidate_transactions(selected_files)
+                    self.consolidate_transactions(selected_files, parallel=parallel)
             
             if st.button("Apply Historical Categories"):
                 with st.spinner("Applying Historical Categories..."):
@@ -1,4 +1,6 @@
 import os
+import hashlib
+import re
 import pandas as pd
 import streamlit as st
 from st_aggrid import AgGrid, GridOptionsBuilder, GridUpdateMode
@@ -8,7 +10,15 @@ from io import BytesIO
 import json
 from components.sidebar import Filter
 from dotenv import load_dotenv
-from tabs.transaction_service import SOURCE_FILE_COLUMN
+from tabs.transaction_service import SOURCE_FILE_COLUMN, TransactionService
+from tabs.transaction_fingerprint import TRANSACTION_ID_COLUMN
+from tabs.excel_reader import load_predefined_categories
+from tabs.backup_service import BackupService
+from tabs.bulk_recategorizer import (
+    match_transactions,
+    preview_recategorization,
+    recategorization_changes,
+)
 load_dotenv()
 
 
@@ -25,10 +35,13 @@ categories_file_path = config["CATEGORIES_FILE_PATH"]
 CONSOLIDATED_FILE_KEY = config["CONSOLIDATED_FILE_KEY"]
 ALL_ACCOUNTS_EDITED_FILE_PATH = config["ALL_ACCOUNTS_EDITED_FILE_PATH"]
 BACKUP_DIR_KEY = config["BACKUP_DIR_KEY"]
+PAGE_SIZE_OPTIONS = [50, 100, 250, 500]
+PENDING_EDITS_KEY = "pending_category_edits"
+EDITOR_KEY_PREFIX = "transaction_editor_page"
+EDITOR_GENERATION_KEY = "transaction_editor_generation"
 
-# Get predefined categories from S3
-categories_df = pd.read_excel(categories_file_path)
-predefined_categories = sorted(categories_df['Custom Categories'].unique().tolist())
+# Get predefined categories (cached until the workbook changes)
+predefined_categories = load_predefined_categories(categories_file_path)
 
 class TransactionEditor:
     def __init__(self, filtered_df, df):
@@ -43,6 +56,8 @@ class TransactionEditor:
         # self.consolidated_file_key = CONSOLIDATED_FILE_KEY
         self.edited_file_key = ALL_ACCOUNTS_EDITED_FILE_PATH
         self.backup_dir_key = BACKUP_DIR_KEY
+        self.transaction_service = TransactionService()
+        self.backup_service = BackupService(self.backup_dir_key)
 
         # try:
         #     edited_obj = s3.get_object(Bucket=bucket_name, Key=self.edited_file_key)
@@ -60,7 +75,13 @@ class TransactionEditor:
         #     except s3.exceptions.NoSuchKey:
         #         self.df = pd.DataFrame()
 
+    def _has_transaction_ids(self, df):
+        return TRANSACTION_ID_COLUMN in df.columns and df[TRANSACTION_ID_COLUMN].notna().all()
+
     def _build_row_id(self, df):
+        if self._has_transaction_ids(df):
+            return df[TRANSACTION_ID_COLUMN]
+
         row_id_parts = [
             df["Transaction_Date"].astype("string"),
             df["Description"].astype("string"),
@@ -75,6 +96,78 @@ class TransactionEditor:
             row_id = row_id.str.cat(part, sep="|")
         return row_id
 
+    def _pending_edits(self):
+        """Return the category edits made in this session, keyed by row ID."""
+        return st.session_state.setdefault(PENDING_EDITS_KEY, {})
+
+    def _select_page(self, sorted_index):
+        """
+        Render the paging controls and return the index labels of the visible page.
+        """
+        total_rows = len(sorted_index)
+        page_col, size_col = st.columns(2)
+        with size_col:
+            page_size = st.selectbox("Rows per page", PAGE_SIZE_OPTIONS, index=1, key="editor_page_size")
+        page_count = max((total_rows + page_size - 1) // page_size, 1)
+        with page_col:
+            page_number = st.number_input(
+                "Page", min_value=1, max_value=page_count, value=1, step=1, key="editor_page"
+            )
+        start = (int(page_number) - 1) * page_size
+        end = min(start + page_size, total_rows)
+        st.caption(f"Showing rows {start + 1 if total_rows else 0}-{end} of {total_rows}.")
+        return sorted_index[start:end]
+
+    def _apply_pending_edits(self, df):
+        """Overlay the pending category edits onto a dataset by row ID."""
+        pending_edits = self._pending_edits()
+        if not pending_edits or df.empty:
+            return df
+        df = df.copy()
+        edited_categories = self._build_row_id(df).map(pending_edits)
+        df["Category"] = edited_categories.combine_first(df["Category"])
+        return df
+
+    def _editor_key(self, row_ids):
+        digest = hashlib.sha1(pd.util.hash_array(row_ids.to_numpy()).tobytes()).hexdigest()
+        generation = st.session_state.get(EDITOR_GENERATION_KEY, 0)
+        return f"{EDITOR_KEY_PREFIX}_{generation}_{digest[:16]}"
+
+    def _reset_editor_state(self):
+        """
+        Start the data editor afresh on the next rerun.
+
+        The editor keeps its own `edited_rows` under its key and would merge them
+        into the pending edits again, so the key changes and the old state is dropped.
+        """
+        st.session_state[EDITOR_GENERATION_KEY] = st.session_state.get(EDITOR_GENERATION_KEY, 0) + 1
+        for key in [key for key in st.session_state.keys() if str(key).startswith(EDITOR_KEY_PREFIX)]:
+            del st.session_state[key]
+
+    def save_changes(self):
+        """
+        Persist the pending category edits.
+
+        Datasets with transaction IDs store the edits as one compact change set in
+        the edit journal. Datasets without IDs on every row (pending edits are then
+        keyed by row contents) are rewritten in full.
+        """
+        pending_edits = self._pending_edits()
+        if not pending_edits:
+            st.write("No changes to save.")
+            return
+
+        self.df = self._apply_pending_edits(self.df)
+        if self._has_transaction_ids(self.df):
+            self.transaction_service.edit_journal.record(pending_edits)
+            if self.transaction_service.edit_journal.needs_compaction():
+                self.transaction_service.compact_edit_journal()
+            st.write(f"Saved {len(pending_edits)} category change(s).")
+        else:
+            self.save_to_s3(self.df, self.edited_file_key)
+        pending_edits.clear()
+        self._reset_editor_state()
+
     def main(self):
         """
         Displays a form for editing transactions and provides options to save changes, refresh, or backup the data.
@@ -115,16 +208,24 @@ class TransactionEditor:
             if col not in self.filtered_df.columns:
                 self.filtered_df[col] = None
 
-        self.df = self.df.sort_values(by=sort_order, ascending=ascending)
-        filter_data = self.filtered_df.sort_values(by=sort_order, ascending=ascending)
-        # Display the DataFrame with the specified column order
-        filter_data = filter_data.copy()
-        filter_data["Row_Id"] = self._build_row_id(filter_data)
-        filter_data = filter_data.set_index("Row_Id")
+        # Sort only the key columns server-side and page over the resulting index
+        sorted_index = self.filtered_df[sort_order].sort_values(
+            by=sort_order, ascending=ascending, kind="mergesort"
+        ).index
+        page_rows = self._select_page(sorted_index)
+        page_data = self.filtered_df.loc[page_rows].copy()
+        page_data.index = pd.Index(self._build_row_id(page_data).to_numpy(), name="Row_Id")
+
+        # Show pending edits made on this or other pages
+        pending_edits = self._pending_edits()
+        pending_categories = page_data.index.to_series().map(pending_edits)
+        page_data["Category"] = pending_categories.combine_first(page_data["Category"])
 
-        edited_df = st.data_editor(
-            filter_data[column_order],
-            num_rows="dynamic", 
+        # Key the editor by the rows it shows so its edit state never leaks across pages
+        editor_key = self._editor_key(page_data.index)
+        st.data_editor(
+            page_data[column_order],
+            num_rows="fixed",
             use_container_width=True,
             column_config={
             "Category": st.column_config.SelectboxColumn(
@@ -134,81 +235,165 @@ class TransactionEditor:
                 required=True
             )
             },
-            hide_index=True)
-
-        # Merge edited_df back into self.df
-        self.df = self.df.copy()
-        self.df["Row_Id"] = self._build_row_id(self.df)
-        self.df = self.df.set_index("Row_Id")
-        combined_df = self.df.join(edited_df['Category'], rsuffix='_edited', how='left')
-        combined_df['Category'] = combined_df['Category_edited'].combine_first(combined_df['Category'])
-        combined_df.drop(columns=['Category_edited'], inplace=True)
-        self.df = combined_df.reset_index()
-        self.df = self.df.drop(columns=["Row_Id"])
-        # st.dataframe(self.df)
+            hide_index=True,
+            key=editor_key)
+
+        # Capture only the edited cells, keyed by transaction ID
+        edited_rows = st.session_state.get(editor_key, {}).get("edited_rows", {})
+        for position, changed_cells in edited_rows.items():
+            if "Category" in changed_cells:
+                pending_edits[page_data.index[int(position)]] = changed_cells["Category"]
+        if pending_edits:
+            st.caption(f"{len(pending_edits)} unsaved category change(s).")
 
         col1, col2, col3 = st.columns(3)
 
         with col1:
             if st.button("Save Changes"):
-                self.save_to_s3(self.df, self.edited_file_key)
+                self.save_changes()
 
-        # with col2:
-        #     if st.button("Refresh"):
-        #         self.refresh_transactions()
+        with col2:
+            if st.button("Refresh"):
+                self.refresh_transactions()
 
         with col3:
             if st.button("Backup"):
+                self.df = self._apply_pending_edits(self.df)
                 self.backup_file()
 
+        self.bulk_recategorize()
+        self.manage_backups()
+
+    def bulk_recategorize(self):
+        """
+        Recategorizes every transaction matching a description pattern and optional filters.
+
+        The rule runs over the full dataset rather than the sidebar filter, previews the
+        match counts and saves all changes as a single edit-journal record.
+        """
+        with st.expander("Bulk Recategorize"):
+            if not self._has_transaction_ids(self.df):
+                st.write("Rebuild the datasets to enable bulk recategorization.")
+                return
+
+            pattern_col, category_col = st.columns(2)
+            with pattern_col:
+                pattern = st.text_input("Description contains", key="bulk_pattern")
+                use_regex = st.checkbox("Regular expression", key="bulk_regex")
+            with category_col:
+                new_category = st.selectbox("New category", predefined_categories, key="bulk_category")
+                account_types = st.multiselect(
+                    "Accounts",
+                    sorted(self.df["Account_Type"].dropna().unique().tolist()),
+                    key="bulk_accounts",
+                )
+
+            min_col, max_col, start_col, end_col = st.columns(4)
+            with min_col:
+                min_amount = st.number_input("Min amount", value=None, key="bulk_min_amount")
+            with max_col:
+                max_amount = st.number_input("Max amount", value=None, key="bulk_max_amount")
+            with start_col:
+                start_date = st.date_input("From", value=None, key="bulk_start_date")
+            with end_col:
+                end_date = st.date_input("To", value=None, key="bulk_end_date")
+
+            if not pattern:
+                return
+
+            df = self._apply_pending_edits(self.df)
+            try:
+                mask = match_transactions(
+                    df,
+                    pattern,
+                    regex=use_regex,
+                    account_types=account_types,
+                    amount_range=(min_amount, max_amount),
+                    date_range=(start_date, end_date),
+                )
+            except re.error as error:
+                st.error(f"Invalid regular expression: {error}")
+                return
+            except ValueError as error:
+                st.warning(f"{error} Enter part of a merchant name.")
+                return
+
+            changes = recategorization_changes(df, mask, new_category)
+            st.write(f"{int(mask.sum())} matching transaction(s), {len(changes)} to recategorize.")
+            st.dataframe(preview_recategorization(df, mask, new_category), hide_index=True)
+
+            if st.button("Apply", key="bulk_apply", disabled=not changes):
+                self.transaction_service.edit_journal.record(changes, source="bulk")
+                if self.transaction_service.edit_journal.needs_compaction():
+                    self.transaction_service.compact_edit_journal()
+                pending_edits = self._pending_edits()
+                for transaction_id in changes:
+                    pending_edits.pop(transaction_id, None)
+                self._reset_editor_state()
+                # _apply_pending_edits returns the caller's frame when nothing is pending
+                self.df = df.copy()
+                self.df.loc[mask, "Category"] = new_category
+                st.write(f"Recategorized {len(changes)} transaction(s) as {new_category}.")
+
     def refresh_transactions(self):
         """
-        Refreshes the transactions by comparing the edited DataFrame with the consolidated data from S3.
+        Pulls transactions that are in the consolidated dataset but not yet in the edited dataset.
 
-        Parameters:
-        edited_df (pd.DataFrame): The DataFrame containing the edited transactions.
+        New rows are found with a vectorized anti-join on Transaction_Id, appended with a
+        Last_Updated stamp and reported by account type.
+        """
+        new_transactions, counts_by_account = self.transaction_service.pull_new_transactions()
+        if new_transactions.empty:
+            st.write("No new transactions to add.")
+            return
 
-        Raises:
-        s3.exceptions.NoSuchKey: If the edited file does not exist in the S3 bucket.
-        """
-        try:
-            consolidated_obj = s3.get_object(Bucket=bucket_name, Key=self.consolidated_file_key)
-            consolidated_df = pd.read_csv(BytesIO(consolidated_obj['Body'].read()))
-            new_transactions = consolidated_df[~consolidated_df[['Transaction_Date', 'Amount', 'Account_Type', 'Description']].apply(tuple, 1).isin(
-                self.df[['Transaction_Date', 'Amount', 'Account_Type', 'Description']].apply(tuple, 1))]
-            if not new_transactions.empty:
-                
-                new_transactions['Last_Updated'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                st.info("New Transactions:")
-                st.dataframe(new_transactions)
-                updated_df = pd.concat([self.df, new_transactions]).reset_index(drop=True)
-                self.save_to_s3(updated_df, self.edited_file_key)
-                st.write("Transactions refreshed successfully!")
-            else:
-                st.write("No new transactions to add.")
-        except s3.exceptions.NoSuchKey:
-            st.write("Edited file does not exist.")
+        st.info(f"Added {len(new_transactions)} new transaction(s):")
+        st.dataframe(counts_by_account.rename_axis("Account_Type").reset_index(), hide_index=True)
+        st.dataframe(new_transactions, use_container_width=True)
+        st.write("Transactions refreshed successfully!")
 
     def backup_file(self):
         """
-        Creates a backup of the edited DataFrame by saving it to an S3 bucket with a timestamped filename.
+        Creates an incremental snapshot of the edited DataFrame in the S3 backup directory.
 
-        Args:
-            edited_df (pd.DataFrame): The DataFrame containing the edited transaction data.
-
-        Raises:
-            s3.exceptions.NoSuchKey: If the specified S3 key does not exist.
+        Only the monthly chunks that changed since earlier snapshots are uploaded. Snapshots
+        beyond the configured retention are pruned afterwards.
 
         Side Effects:
-            Writes a message to the Streamlit app indicating the success or failure of the backup operation.
-        """
-        try:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            backup_filename_key = os.path.join(self.backup_dir_key, f"all_accounts_edited_backup_{timestamp}.csv")
-            self.save_to_s3(self.df, backup_filename_key)
-            st.write(f"Backup created successfully: {backup_filename_key}")
-        except s3.exceptions.NoSuchKey:
-            st.write("Edited file does not exist.")
+            Writes a message to the Streamlit app describing the snapshot.
+        """
+        snapshot = self.backup_service.create_snapshot(self.df)
+        pruned_snapshots, pruned_chunks = self.backup_service.prune()
+        st.write(
+            f"Backup created successfully: {snapshot['manifest_key']} "
+            f"({snapshot['uploaded_chunks']} chunk(s) uploaded, {snapshot['reused_chunks']} reused)."
+        )
+        if pruned_snapshots:
+            st.caption(f"Pruned {pruned_snapshots} old snapshot(s) and {pruned_chunks} unused chunk(s).")
+
+    def manage_backups(self):
+        """
+        Lists the stored snapshots and restores the selected one as the edited dataset.
+        """
+        with st.expander("Restore Backup"):
+            snapshots = self.backup_service.list_snapshots()
+            if not snapshots:
+                st.write("No backups available.")
+                return
+
+            manifest_key = st.selectbox(
+                "Snapshot",
+                options=snapshots,
+                format_func=lambda key: os.path.splitext(os.path.basename(key))[0],
+                key="restore_snapshot",
+            )
+            if st.button("Restore"):
+                restored_df = self.backup_service.restore_snapshot(manifest_key)
+                self.transaction_service.restore_edited_dataset(restored_df)
+                self._pending_edits().clear()
+                self._reset_editor_state()
+                self.df = restored_df
+                st.write(f"Restored {len(restored_df)} transaction(s) from {manifest_key}.")
 
     def save_to_s3(self, df, key):
         """
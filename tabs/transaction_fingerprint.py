@@ -0,0 +1,164 @@
+import pandas as pd
+
+from tabs.amount_utils import amounts_to_cents, normalize_amount_series
+
+TRANSACTION_ID_COLUMN = "Transaction_Id"
+FINGERPRINT_COLUMN = "Fingerprint"
+OCCURRENCE_COLUMN = "Occurrence"
+DUPLICATE_REPORT_COLUMNS = ["Source_File", "Overlaps_With", "Duplicate_Transactions"]
+
+
+def canonical_description(series: pd.Series) -> pd.Series:
+    """Upper-case descriptions and collapse punctuation and repeated whitespace."""
+    codes, uniques = pd.factorize(series.astype("string"), use_na_sentinel=True)
+    canonical = (
+        pd.Series(uniques, dtype="string")
+        .str.upper()
+        .str.replace(r"[^A-Z0-9]+", " ", regex=True)
+        .str.strip()
+    )
+    lookup = pd.concat([canonical, pd.Series([""], dtype="string")], ignore_index=True)
+    return pd.Series(lookup.to_numpy()[codes], index=series.index, dtype="string")
+
+
+def canonical_merchant(series: pd.Series) -> pd.Series:
+    """
+    Reduce descriptions to a merchant key by also dropping digits.
+
+    Store numbers, reference codes and dates embedded in statement descriptions
+    vary between charges from the same merchant, so they are removed.
+    """
+    codes, uniques = pd.factorize(canonical_description(series), use_na_sentinel=True)
+    merchants = (
+        pd.Series(uniques, dtype="string")
+        .str.replace(r"\d+", " ", regex=True)
+        .str.replace(r"\s+", " ", regex=True)
+        .str.strip()
+    )
+    lookup = pd.concat([merchants, pd.Series([""], dtype="string")], ignore_index=True)
+    return pd.Series(lookup.to_numpy()[codes], index=series.index, dtype="string")
+
+
+def transaction_fingerprints(df: pd.DataFrame) -> pd.Series:
+    """
+    Return a 64-bit fingerprint per transaction.
+
+    The fingerprint covers account, transaction date, amount in cents and the
+    canonical description, so the same transaction exported twice hashes equal.
+    Dates are hashed at a fixed nanosecond unit: pandas infers seconds for `date`
+    objects but microseconds for ISO strings read back from CSV, and the two
+    would otherwise hash differently.
+    """
+    keys = pd.DataFrame(
+        {
+            "Account_Type": df["Account_Type"].astype("string"),
+            "Transaction_Date": pd.to_datetime(
+                df["Transaction_Date"], errors="coerce"
+            ).astype("datetime64[ns]"),
+            "Amount": amounts_to_cents(normalize_amount_series(df["Amount"])),
+            "Description": canonical_description(df["Description"]),
+        },
+        index=df.index,
+    )
+    return pd.util.hash_pandas_object(keys, index=False)
+
+
+def occurrence_numbers(fingerprints: pd.Series, source_files: pd.Series) -> pd.Series:
+    """Number repeated fingerprints within each source file (0 for the first)."""
+    return fingerprints.groupby([source_files, fingerprints], sort=False).cumcount()
+
+
+def transaction_keys(df: pd.DataFrame, source_column=None) -> pd.DataFrame:
+    """Return the fingerprint and per-file occurrence number of each transaction."""
+    keys = pd.DataFrame(index=df.index)
+    keys[FINGERPRINT_COLUMN] = transaction_fingerprints(df)
+    if source_column is not None and source_column in df.columns:
+        source_files = df[source_column].astype("string").fillna("")
+    else:
+        source_files = pd.Series("", index=df.index)
+    keys[OCCURRENCE_COLUMN] = occurrence_numbers(keys[FINGERPRINT_COLUMN], source_files)
+    return keys
+
+
+def transaction_ids(keys: pd.DataFrame) -> pd.Series:
+    """Hash fingerprint and occurrence into a signed 64-bit transaction ID."""
+    hashed = pd.util.hash_pandas_object(
+        keys[[FINGERPRINT_COLUMN, OCCURRENCE_COLUMN]], index=False
+    )
+    return pd.Series(
+        hashed.to_numpy().view("int64"), index=keys.index, name=TRANSACTION_ID_COLUMN
+    )
+
+
+def _with_transaction_ids(df: pd.DataFrame, ids: pd.Series, source_column=None):
+    df = df.drop(columns=[TRANSACTION_ID_COLUMN], errors="ignore")
+    position = (
+        df.columns.get_loc(source_column) + 1
+        if source_column is not None and source_column in df.columns
+        else len(df.columns)
+    )
+    df.insert(position, TRANSACTION_ID_COLUMN, ids)
+    return df
+
+
+def assign_transaction_ids(df: pd.DataFrame, source_column=None) -> pd.DataFrame:
+    """Return a copy of `df` with a `Transaction_Id` column computed from its keys."""
+    if df.empty:
+        return _with_transaction_ids(
+            df.copy(), pd.Series(dtype="int64"), source_column
+        )
+    return _with_transaction_ids(
+        df.copy(), transaction_ids(transaction_keys(df, source_column)), source_column
+    )
+
+
+def ensure_transaction_ids(df: pd.DataFrame, source_column=None) -> pd.DataFrame:
+    """Add transaction IDs to datasets saved before IDs were persisted."""
+    if TRANSACTION_ID_COLUMN in df.columns and df[TRANSACTION_ID_COLUMN].notna().all():
+        if df[TRANSACTION_ID_COLUMN].dtype == "int64":
+            return df
+        return df.astype({TRANSACTION_ID_COLUMN: "int64"})
+    return assign_transaction_ids(df, source_column)
+
+
+def drop_duplicate_transactions(df: pd.DataFrame, source_column: str):
+    """
+    Drop transactions repeated across overlapping source files.
+
+    Legitimate same-day repeats inside one file are kept because each repeat
+    carries its own occurrence number. The first file in frame order wins. The
+    returned frame carries the stable `Transaction_Id` of every kept row.
+
+    Returns:
+        tuple: The deduplicated frame and a report of overlapping file pairs.
+    """
+    if df.empty:
+        return (
+            assign_transaction_ids(df, source_column),
+            pd.DataFrame(columns=DUPLICATE_REPORT_COLUMNS),
+        )
+
+    keys = transaction_keys(df, source_column)
+    df = _with_transaction_ids(df, transaction_ids(keys), source_column)
+    duplicate_mask = keys.duplicated(keep="first")
+    if not duplicate_mask.any():
+        return df, pd.DataFrame(columns=DUPLICATE_REPORT_COLUMNS)
+
+    kept_sources = (
+        keys.loc[~duplicate_mask]
+        .assign(Overlaps_With=df.loc[~duplicate_mask, source_column])
+        .set_index([FINGERPRINT_COLUMN, OCCURRENCE_COLUMN])["Overlaps_With"]
+    )
+    duplicates = keys.loc[duplicate_mask].join(
+        kept_sources, on=[FINGERPRINT_COLUMN, OCCURRENCE_COLUMN]
+    )
+    duplicates["Source_File"] = df.loc[duplicate_mask, source_column]
+    report = (
+        duplicates.groupby(["Source_File", "Overlaps_With"])
+        .size()
+        .rename("Duplicate_Transactions")
+        .reset_index()
+        .sort_values("Duplicate_Transactions", ascending=False)
+        .reset_index(drop=True)
+    )
+    return df.loc[~duplicate_mask], report
@@ -1,6 +1,11 @@
 import json
+import multiprocessing
+from datetime import datetime
 import os
-from io import StringIO
+import re
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO, StringIO
 
 import boto3
 from botocore.exceptions import ClientError
@@ -8,6 +13,31 @@ import pandas as pd
 from dotenv import load_dotenv
 
 from tabs.amount_utils import normalize_amount_series
+from tabs.anomaly_detector import AnomalyDetector
+from tabs.edit_journal import EditJournal
+from tabs.recurring_detector import RecurringDetector
+from tabs.date_utils import (
+    DATE_FORMAT_METADATA_KEY,
+    ISO_DATE_FORMAT,
+    parse_date_series,
+)
+from tabs.statement_parser import (
+    SOURCE_FILE_COLUMN,
+    account_type_from_path,
+    forget_statement_date_formats,
+    frame_from_arrow,
+    parse_statement_bytes,
+    prepare_statement_frame,
+    resolve_statement_date_format,
+    sort_transactions,
+)
+from tabs.transaction_fingerprint import (
+    DUPLICATE_REPORT_COLUMNS,
+    TRANSACTION_ID_COLUMN,
+    assign_transaction_ids,
+    drop_duplicate_transactions,
+    ensure_transaction_ids,
+)
 
 load_dotenv()
 
@@ -22,11 +52,9 @@ s3 = boto3.client(
 bucket_name = config["S3_BUCKET_NAME"]
 account_types = config["ACCOUNT_TYPES"]
 output_headers = config["OUTPUT_HEADERS"]
-amount_negative_accounts = config["AMOUNT_NEGATIVE_ACCOUNTS"]
 all_accounts_file_path = config["ALL_ACCOUNTS_FILE_PATH"]
 all_accounts_edited_file_path = config["ALL_ACCOUNTS_EDITED_FILE_PATH"]
 
-SOURCE_FILE_COLUMN = "Source_File"
 TRANSACTION_MATCH_COLUMNS = [
     "Transaction_Date",
     "Account_Type",
@@ -34,11 +62,17 @@ TRANSACTION_MATCH_COLUMNS = [
     "Amount",
 ]
 SOURCE_AWARE_MATCH_COLUMNS = [SOURCE_FILE_COLUMN] + TRANSACTION_MATCH_COLUMNS
+PARALLEL_MIN_FILES = 2
+SOURCE_FILE_NAME_PATTERN = re.compile(r"(\d{4}-\d{2}-\d{2})_(\d{4}-\d{2}-\d{2})\.csv$")
 
 
 class TransactionService:
     def __init__(self, data_dir="data"):
         self.data_dir = data_dir
+        self.edit_journal = EditJournal()
+        self.anomaly_detector = AnomalyDetector()
+        self.recurring_detector = RecurringDetector()
+        self.duplicate_report = pd.DataFrame(columns=DUPLICATE_REPORT_COLUMNS)
 
     def list_source_files(self):
         file_list = []
@@ -50,10 +84,28 @@ class TransactionService:
                     file_list.append(obj["Key"])
         return sorted(file_list)
 
+    def read_bytes_from_s3(self, file_path):
+        obj = s3.get_object(Bucket=bucket_name, Key=file_path)
+        return obj["Body"].read()
+
+    def read_source_object(self, file_path):
+        """Return the raw bytes of a source file and its recorded date format."""
+        obj = s3.get_object(Bucket=bucket_name, Key=file_path)
+        date_format = obj.get("Metadata", {}).get(DATE_FORMAT_METADATA_KEY)
+        return obj["Body"].read(), date_format
+
+    def record_date_format(self, file_path, date_format):
+        s3.copy_object(
+            Bucket=bucket_name,
+            Key=file_path,
+            CopySource={"Bucket": bucket_name, "Key": file_path},
+            Metadata={DATE_FORMAT_METADATA_KEY: date_format},
+            MetadataDirective="REPLACE",
+        )
+
     def read_csv_from_s3(self, file_path, optional=False):
         try:
-            obj = s3.get_object(Bucket=bucket_name, Key=file_path)
-            return pd.read_csv(StringIO(obj["Body"].read().decode("utf-8")))
+            return pd.read_csv(BytesIO(self.read_bytes_from_s3(file_path)))
         except ClientError as exc:
             error_code = exc.response.get("Error", {}).get("Code")
             if optional and error_code in {"NoSuchKey", "404"}:
@@ -65,59 +117,120 @@ class TransactionService:
         df.to_csv(csv_buffer, index=False)
         s3.put_object(Bucket=bucket_name, Key=file_path, Body=csv_buffer.getvalue())
 
-    def delete_source_file(self, file_path):
-        s3.delete_object(Bucket=bucket_name, Key=file_path)
+    def read_edited_dataset(self):
+        """Read the edited dataset with journaled category changes applied."""
+        edited_df = self.read_csv_from_s3(all_accounts_edited_file_path, optional=True)
+        return self.edit_journal.apply(edited_df)
 
-    def _empty_transactions_df(self):
-        return pd.DataFrame(columns=output_headers + [SOURCE_FILE_COLUMN])
-
-    def _prepare_dataframe(self, df, file_path):
-        account_type = file_path.split("/")[-2]
-        prepared_df = df.copy()
-        prepared_df["Account_Type"] = account_type
-        prepared_df[SOURCE_FILE_COLUMN] = file_path
+    def save_edited_dataset(self, edited_df):
+        """Write the edited dataset and drop the journal records folded into it."""
+        self.save_csv_to_s3(edited_df, all_accounts_edited_file_path)
+        self.edit_journal.clear()
 
-        prepared_df["Amount"] = normalize_amount_series(prepared_df["Amount"])
+    def compact_edit_journal(self):
+        self.save_edited_dataset(self.read_edited_dataset())
 
-        if account_type in amount_negative_accounts:
-            prepared_df["Amount"] = prepared_df["Amount"] * -1
+    def restore_edited_dataset(self, restored_df):
+        """Replace the edited dataset with a restored snapshot and discard all journaled edits."""
+        self.save_csv_to_s3(restored_df, all_accounts_edited_file_path)
+        self.edit_journal.clear(self.edit_journal.list_record_keys())
 
-        prepared_df["Amount"] = prepared_df["Amount"].round(2)
+    def delete_source_file(self, file_path):
+        s3.delete_object(Bucket=bucket_name, Key=file_path)
+        forget_statement_date_formats(file_path)
 
-        for header in output_headers + [SOURCE_FILE_COLUMN]:
-            if header not in prepared_df.columns:
-                prepared_df[header] = pd.NA
+    def _empty_transactions_df(self):
+        return pd.DataFrame(
+            columns=output_headers + [SOURCE_FILE_COLUMN, TRANSACTION_ID_COLUMN]
+        )
 
-        prepared_df["Transaction_Date"] = pd.to_datetime(
-            prepared_df["Transaction_Date"], errors="coerce"
-        ).dt.date
-        prepared_df["Post_Date"] = pd.to_datetime(
-            prepared_df["Post_Date"], errors="coerce"
-        ).dt.date
+    def _prepare_dataframe(self, df, file_path, date_format=None, date_format_resolved=False):
+        return prepare_statement_frame(df, file_path, date_format, date_format_resolved)
 
-        ordered_columns = output_headers + [SOURCE_FILE_COLUMN]
-        remaining_columns = [
-            column for column in prepared_df.columns if column not in ordered_columns
-        ]
-        return prepared_df[ordered_columns + remaining_columns]
+    def _sort_transactions(self, df):
+        return sort_transactions(df)
 
-    def consolidate_transactions(self, selected_files):
+    def iter_prepared_frames(self, selected_files):
+        """Yield each source file as a prepared frame presorted in output order."""
+        for file_path in selected_files:
+            raw_bytes, date_format = self.read_source_object(file_path)
+            try:
+                df = pd.read_csv(BytesIO(raw_bytes))
+            except pd.errors.EmptyDataError:
+                continue
+            if df.empty:
+                continue
+
+            date_format_resolved = date_format is None
+            if date_format_resolved:
+                # Detect the format once and record it so later reads take the fast path.
+                date_format = resolve_statement_date_format(df, file_path)
+                if date_format:
+                    self.record_date_format(file_path, date_format)
+
+            yield self._sort_transactions(
+                self._prepare_dataframe(df, file_path, date_format, date_format_resolved)
+            )
+
+    def iter_prepared_frames_parallel(self, selected_files, max_workers=None):
+        """
+        Parse files across a process pool and yield the prepared frames in order.
+
+        Downloads stay on the calling thread and overlap with parsing; workers
+        return Arrow buffers that are rebuilt into frames here.
+        """
+        max_workers = max_workers or os.cpu_count() or 1
+        executor = ProcessPoolExecutor(
+            max_workers=min(max_workers, len(selected_files)),
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+        with executor:
+            futures = [
+                executor.submit(
+                    parse_statement_bytes, file_path, *self.read_source_object(file_path)
+                )
+                for file_path in selected_files
+            ]
+            for file_path, future in zip(selected_files, futures):
+                result = future.result()
+                if result is None:
+                    continue
+                payload, detected_format = result
+                if detected_format:
+                    self.record_date_format(file_path, detected_format)
+                yield frame_from_arrow(payload)
+
+    def consolidate_transactions(self, selected_files, parallel=False, deduplicate=True):
         if not selected_files:
             return self._empty_transactions_df()
 
-        all_data = pd.DataFrame()
-        for file_path in selected_files:
-            df = self.read_csv_from_s3(file_path)
-            prepared_df = self._prepare_dataframe(df, file_path)
-            all_data = pd.concat([all_data, prepared_df], ignore_index=True)
+        frames = None
+        if parallel and len(selected_files) >= PARALLEL_MIN_FILES:
+            try:
+                frames = list(self.iter_prepared_frames_parallel(selected_files))
+            except (BrokenProcessPool, OSError, NotImplementedError):
+                frames = None
 
-        if all_data.empty:
+        if frames is None:
+            frames = list(self.iter_prepared_frames(selected_files))
+        if not frames:
             return self._empty_transactions_df()
 
-        return all_data.sort_values(
-            by=["Transaction_Date", "Description", "Amount"],
-            ascending=[False, True, True],
-        ).reset_index(drop=True)
+        # One concat of the presorted per-file runs; the stable sort on the packed
+        # key below (a timsort) detects the runs and merges them.
+        all_data = pd.concat(frames, ignore_index=True)
+        frames.clear()
+
+        if deduplicate:
+            # Overlapping statement exports repeat transactions; the file listed
+            # first keeps its copy. Kept rows are stamped with their Transaction_Id.
+            all_data, self.duplicate_report = drop_duplicate_transactions(
+                all_data, SOURCE_FILE_COLUMN
+            )
+        else:
+            all_data = assign_transaction_ids(all_data, SOURCE_FILE_COLUMN)
+
+        return self._sort_transactions(all_data).reset_index(drop=True)
 
     def _normalize_match_columns(self, df):
         normalized_df = df.copy()
@@ -125,8 +238,8 @@ class TransactionService:
             return normalized_df
 
         if "Transaction_Date" in normalized_df.columns:
-            normalized_df["Transaction_Date"] = pd.to_datetime(
-                normalized_df["Transaction_Date"], errors="coerce"
+            normalized_df["Transaction_Date"] = parse_date_series(
+                normalized_df["Transaction_Date"], ISO_DATE_FORMAT
             ).dt.date
 
         if "Amount" in normalized_df.columns:
@@ -140,6 +253,12 @@ class TransactionService:
         if edited_df.empty or "Category" not in edited_df.columns:
             return pd.DataFrame()
 
+        if TRANSACTION_ID_COLUMN in edited_df.columns:
+            preserved_edits = edited_df.dropna(subset=[TRANSACTION_ID_COLUMN])
+            return preserved_edits[[TRANSACTION_ID_COLUMN, "Category"]].astype(
+                {TRANSACTION_ID_COLUMN: "int64"}
+            ).drop_duplicates(subset=[TRANSACTION_ID_COLUMN], keep="last")
+
         normalized_edited_df = self._normalize_match_columns(edited_df)
 
         preferred_match_columns = (
@@ -189,15 +308,214 @@ class TransactionService:
         )
         return rebuilt_df.drop(columns=["Category_edited"])
 
-    def rebuild_all_datasets(self):
+    def rebuild_all_datasets(self, parallel=False):
         source_files = self.list_source_files()
-        consolidated_df = self.consolidate_transactions(source_files)
-        existing_edited_df = self.read_csv_from_s3(
-            all_accounts_edited_file_path, optional=True
-        )
+        consolidated_df = self.consolidate_transactions(source_files, parallel=parallel)
+        existing_edited_df = self.read_edited_dataset()
         edited_df = self.reapply_edited_categories(consolidated_df, existing_edited_df)
 
         self.save_csv_to_s3(consolidated_df, all_accounts_file_path)
-        self.save_csv_to_s3(edited_df, all_accounts_edited_file_path)
+        self.save_edited_dataset(edited_df)
+        self.anomaly_detector.rebuild(consolidated_df)
+        self.recurring_detector.rebuild(consolidated_df)
 
         return consolidated_df, edited_df
+
+    def _source_file_date_range(self, file_path):
+        match = SOURCE_FILE_NAME_PATTERN.search(file_path)
+        if not match:
+            return None
+        return match.group(1), match.group(2)
+
+    def _overlapping_source_files(self, removed_files, remaining_files):
+        """Return remaining files whose date range overlaps a removed file of the same account."""
+        overlapping = []
+        for file_path in remaining_files:
+            file_range = self._source_file_date_range(file_path)
+            for removed_path in removed_files:
+                if account_type_from_path(file_path) != account_type_from_path(removed_path):
+                    continue
+                removed_range = self._source_file_date_range(removed_path)
+                if (
+                    file_range is None
+                    or removed_range is None
+                    or (file_range[0] <= removed_range[1] and removed_range[0] <= file_range[1])
+                ):
+                    overlapping.append(file_path)
+                    break
+        return overlapping
+
+    def _append_missing_transactions(self, df, new_df):
+        """Append rows of `new_df` whose Transaction_Id is not already in `df`."""
+        if new_df.empty:
+            return df, new_df
+        if df.empty:
+            return new_df.reset_index(drop=True), new_df
+
+        missing_df = new_df[~new_df[TRANSACTION_ID_COLUMN].isin(df[TRANSACTION_ID_COLUMN])]
+        if missing_df.empty:
+            return df, missing_df
+        combined_df = pd.concat([df, missing_df], ignore_index=True)
+        return self._sort_transactions(combined_df).reset_index(drop=True), missing_df
+
+    def remove_source_files(self, file_keys):
+        """
+        Delete source files and drop their rows from both datasets in place.
+
+        Only rows tagged with the removed `Source_File` values are dropped, so all
+        other edits stay untouched. Rows from remaining files that were skipped as
+        duplicates of the removed files are restored by re-reading just the files
+        whose date range overlaps. Datasets saved before `Source_File` and
+        `Transaction_Id` were tracked fall back to a full rebuild.
+        """
+        removed_files = set(file_keys)
+        for file_key in removed_files:
+            self.delete_source_file(file_key)
+
+        consolidated_df = self.read_csv_from_s3(all_accounts_file_path, optional=True)
+        edited_df = self.read_edited_dataset()
+        tracked_columns = {SOURCE_FILE_COLUMN, TRANSACTION_ID_COLUMN}
+        if not (
+            tracked_columns.issubset(consolidated_df.columns)
+            and (edited_df.empty or tracked_columns.issubset(edited_df.columns))
+        ):
+            return self.rebuild_all_datasets()
+
+        consolidated_df = self._normalize_match_columns(
+            consolidated_df[~consolidated_df[SOURCE_FILE_COLUMN].isin(removed_files)]
+        )
+        # Removing files can empty the edited dataset, which still has to be saved
+        has_edited_dataset = not edited_df.empty
+        if has_edited_dataset:
+            edited_df = self._normalize_match_columns(
+                edited_df[~edited_df[SOURCE_FILE_COLUMN].isin(removed_files)]
+            )
+
+        overlapping_files = self._overlapping_source_files(
+            removed_files, self.list_source_files()
+        )
+        if overlapping_files:
+            # The partial re-read is not a full consolidation, so keep the last report
+            duplicate_report = self.duplicate_report
+            restored_df = self.consolidate_transactions(overlapping_files)
+            self.duplicate_report = duplicate_report
+            consolidated_df, restored_df = self._append_missing_transactions(
+                consolidated_df, restored_df
+            )
+            if has_edited_dataset:
+                edited_df, _ = self._append_missing_transactions(edited_df, restored_df)
+
+        self.save_csv_to_s3(consolidated_df, all_accounts_file_path)
+        if has_edited_dataset:
+            self.save_edited_dataset(edited_df)
+
+        # Running statistics cannot subtract rows, so derived state is rebuilt
+        self.anomaly_detector.rebuild(consolidated_df)
+        self.recurring_detector.rebuild(consolidated_df)
+
+        return consolidated_df, edited_df
+
+    def append_source_files(self, file_keys):
+        """
+        Consolidate newly stored source files into the existing consolidated dataset.
+
+        Only the new files are read. Rows already present (by `Transaction_Id`) are
+        skipped and rows from a re-uploaded file replace its previous copy. Datasets
+        saved before IDs were tracked are consolidated from scratch.
+
+        Returns:
+            tuple: The updated consolidated dataset and the rows that were appended.
+        """
+        file_keys = sorted(set(file_keys))
+        consolidated_df = self.read_csv_from_s3(all_accounts_file_path, optional=True)
+        tracked_columns = {SOURCE_FILE_COLUMN, TRANSACTION_ID_COLUMN}
+
+        if consolidated_df.empty or not tracked_columns.issubset(consolidated_df.columns):
+            consolidated_df = self.consolidate_transactions(
+                self.list_source_files(), parallel=True
+            )
+            self.save_csv_to_s3(consolidated_df, all_accounts_file_path)
+            self.anomaly_detector.rebuild(consolidated_df)
+            self.recurring_detector.rebuild(consolidated_df)
+            return consolidated_df, consolidated_df[
+                consolidated_df[SOURCE_FILE_COLUMN].isin(file_keys)
+            ]
+
+        previous_ids = consolidated_df[TRANSACTION_ID_COLUMN]
+        replaced_mask = consolidated_df[SOURCE_FILE_COLUMN].isin(file_keys)
+        replaced_ids = previous_ids[replaced_mask]
+        consolidated_df = self._normalize_match_columns(consolidated_df[~replaced_mask])
+        new_df = self.consolidate_transactions(file_keys, parallel=True)
+        consolidated_df, appended_df = self._append_missing_transactions(
+            consolidated_df, new_df
+        )
+        self.save_csv_to_s3(consolidated_df, all_accounts_file_path)
+
+        # Rows of a re-uploaded file are already in the derived state; only rows
+        # that are new to the dataset are scored and folded in.
+        unseen_df = appended_df[~appended_df[TRANSACTION_ID_COLUMN].isin(previous_ids)]
+        if replaced_ids.isin(consolidated_df[TRANSACTION_ID_COLUMN]).all():
+            # Score only the new rows against the stored running statistics
+            self.anomaly_detector.score_new_transactions(unseen_df)
+        else:
+            # A re-upload dropped rows, which running statistics cannot subtract
+            self.anomaly_detector.rebuild(consolidated_df)
+        # Re-detect only the merchants that received new charges
+        self.recurring_detector.update(consolidated_df, unseen_df)
+        return consolidated_df, appended_df
+
+    def _rederive_transaction_ids(self, consolidated_df, edited_df):
+        """
+        Recompute the IDs of both datasets from their key columns.
+
+        Persisted `Transaction_Id` values may come from an older hashing, so they
+        are not compared directly. Occurrences are numbered per source file only
+        when both datasets record it.
+        """
+        source_column = (
+            SOURCE_FILE_COLUMN
+            if SOURCE_FILE_COLUMN in consolidated_df.columns and SOURCE_FILE_COLUMN in edited_df.columns
+            else None
+        )
+        return (
+            assign_transaction_ids(consolidated_df, source_column),
+            assign_transaction_ids(edited_df, source_column),
+        )
+
+    def find_new_transactions(self, consolidated_df, edited_df):
+        """Return consolidated rows whose re-derived Transaction_Id is missing from the edited dataset."""
+        if consolidated_df.empty:
+            return consolidated_df
+        if edited_df.empty:
+            return ensure_transaction_ids(consolidated_df, SOURCE_FILE_COLUMN)
+
+        consolidated_df, edited_df = self._rederive_transaction_ids(consolidated_df, edited_df)
+        new_mask = ~consolidated_df[TRANSACTION_ID_COLUMN].isin(edited_df[TRANSACTION_ID_COLUMN])
+        return consolidated_df[new_mask]
+
+    def pull_new_transactions(self):
+        """
+        Append consolidated transactions missing from the edited dataset.
+
+        Returns:
+            tuple: The appended rows (stamped with `Last_Updated`) and their counts
+                   by account type.
+        """
+        consolidated_df = self.read_csv_from_s3(all_accounts_file_path, optional=True)
+        edited_df = self.read_edited_dataset()
+        new_transactions = self.find_new_transactions(consolidated_df, edited_df)
+        if new_transactions.empty:
+            return new_transactions, pd.Series(dtype="int64", name="New_Transactions")
+
+        new_transactions = self._normalize_match_columns(new_transactions)
+        new_transactions["Last_Updated"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        if not edited_df.empty:
+            # Journaled edits are folded in by this save, so existing rows can take
+            # the re-derived IDs the new rows were matched with.
+            _, edited_df = self._rederive_transaction_ids(consolidated_df, edited_df)
+            edited_df = self._normalize_match_columns(edited_df)
+        updated_df = pd.concat([edited_df, new_transactions], ignore_index=True)
+        self.save_edited_dataset(self._sort_transactions(updated_df).reset_index(drop=True))
+
+        counts = new_transactions["Account_Type"].value_counts().rename("New_Transactions")
+        return new_transactions, counts
@@ -1,26 +1,100 @@
 import pandas as pd
-import plotly.express as px
 import streamlit as st
 
+from tabs.amount_utils import normalize_amount_series
+from tabs.cache_utils import LRUCache, frame_fingerprint
+from tabs.chart_utils import line_chart
+
+GRANULARITIES = {
+    "Daily": "D",
+    "Weekly": "W",
+    "Monthly": "M",
+    "Quarterly": "Q",
+    "Yearly": "Y",
+}
+BREAKDOWNS = {"None": None, "Category": "Category", "Account": "Account_Type"}
+TREND_COLUMNS = ["Income", "Expenses", "Net"]
+LEDGER_KEYS = ["Date", "Category", "Account_Type"]
+
+_ledger_cache = LRUCache(maxsize=8)
+_trend_cache = LRUCache(maxsize=64)
+
+
+def daily_ledger(df):
+    """
+    Aggregate transactions to one row per day, category and account.
+
+    This is the only pass over the transactions; every granularity and
+    breakdown is rolled up from the (much smaller) ledger. The input frame is
+    never modified.
+    """
+    fingerprint = frame_fingerprint(df, ["Transaction_Date", "Amount", "Category", "Account_Type"])
+    cached = _ledger_cache.get(fingerprint)
+    if cached is not None:
+        return fingerprint, cached
+
+    amounts = normalize_amount_series(df["Amount"]).fillna(0.0)
+    ledger = pd.DataFrame(
+        {
+            "Date": pd.to_datetime(df["Transaction_Date"], format="mixed", errors="coerce").dt.normalize(),
+            "Category": df["Category"].astype("string").fillna("Uncategorized"),
+            "Account_Type": df["Account_Type"].astype("string").fillna("Unknown"),
+            "Income": amounts.clip(lower=0),
+            "Expenses": amounts.clip(upper=0),
+        }
+    ).dropna(subset=["Date"])
+    ledger = ledger.groupby(LEDGER_KEYS, sort=True, observed=True)[["Income", "Expenses"]].sum()
+    ledger = ledger.reset_index()
+    return fingerprint, _ledger_cache.put(fingerprint, ledger)
+
+
+def compute_trends(df, granularity="Monthly", breakdown=None):
+    """
+    Return income, expenses and net per period.
+
+    Parameters:
+    df (pd.DataFrame): Transactions with Transaction_Date, Amount, Category and Account_Type.
+    granularity (str): One of the keys of GRANULARITIES.
+    breakdown (str): Optional column to split the series by, "Category" or "Account_Type".
+
+    Returns:
+    pd.DataFrame: One row per period (and breakdown value) with Date, Income, Expenses and Net.
+    """
+    fingerprint, ledger = daily_ledger(df)
+    cache_key = (fingerprint, granularity, breakdown)
+    cached = _trend_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    freq = GRANULARITIES[granularity]
+    periods = ledger["Date"] if freq == "D" else ledger["Date"].dt.to_period(freq).dt.start_time
+    group_keys = [periods.rename("Date")]
+    if breakdown:
+        group_keys.append(ledger[breakdown])
+
+    trends = ledger.groupby(group_keys, sort=True, observed=True)[["Income", "Expenses"]].sum()
+    trends = trends.reset_index()
+    trends["Net"] = trends["Income"] + trends["Expenses"]
+    return _trend_cache.put(cache_key, trends)
+
+
 class FinanceTrends:
     def __init__(self, data):
         """
-        Initialize with a DataFrame containing 'Date', 'Income', and 'Expenses' columns.
+        Initialize with a DataFrame of transactions. The DataFrame is not modified.
         """
-        self.data = data
-        self.data['Transaction_Date'] = pd.to_datetime(self.data['Transaction_Date'])
-        self.data['YearMonth'] = self.data['Transaction_Date'].dt.to_period('M')
-        self.data['Income'] = self.data['Amount'].apply(lambda x: x if x > 0 else 0)
-        self.data['Expenses'] = self.data['Amount'].apply(lambda x: x if x < 0 else 0)
-        self.data = self.data.groupby('YearMonth').agg({'Income': 'sum', 'Expenses': 'sum'}).reset_index()
-        self.data = self.data.sort_values('YearMonth')
-        self.data['Date'] = self.data['YearMonth'].dt.to_timestamp()
+        self.transactions = data
+        self.data = (
+            compute_trends(data)
+            if not data.empty
+            else pd.DataFrame(columns=["Date"] + TREND_COLUMNS)
+        )
 
     def plot_trends(self):
         """
             This method checks if the data is available. If the data is empty, it displays a warning message.
-            Otherwise, it creates a line chart with 'Date' on the x-axis and 'Income' and 'Expenses' on the y-axis.
-            The chart includes labels for the axes and a title. The chart is then displayed using Streamlit.
+            Otherwise, it lets the user pick a granularity and an optional category or account breakdown and
+            draws the matching income, expenses and net series with Plotly.
 
             Parameters:
             None
@@ -28,13 +102,28 @@ class FinanceTrends:
             Returns:
             None
         """
-        
+
         if self.data.empty:
             st.warning("No data available for the selected filters.")
-        else:
-            fig = px.line(self.data, x='Date', y=['Income', 'Expenses'], 
-                          labels={'value': 'Amount', 'variable': 'Category'},
-                          title='Income and Expenses Over Time')
-            fig.update_layout(xaxis_title='Date', yaxis_title='Amount')
-            st.plotly_chart(fig, use_container_width=True)
+            return
 
+        granularity_col, breakdown_col, measure_col = st.columns(3)
+        with granularity_col:
+            granularity = st.selectbox("Granularity", list(GRANULARITIES), index=2, key="trend_granularity")
+        with breakdown_col:
+            breakdown_label = st.selectbox("Breakdown", list(BREAKDOWNS), key="trend_breakdown")
+        breakdown = BREAKDOWNS[breakdown_label]
+
+        trends = compute_trends(self.transactions, granularity, breakdown)
+        if breakdown is None:
+            fig = line_chart(trends, x='Date', y=TREND_COLUMNS,
+                             labels={'value': 'Amount', 'variable': 'Category'},
+                             title=f'{granularity} Income, Expenses and Net Over Time')
+        else:
+            with measure_col:
+                measure = st.selectbox("Measure", TREND_COLUMNS, index=1, key="trend_measure")
+            fig = line_chart(trends, x='Date', y=measure, color=breakdown,
+                             labels={measure: 'Amount'},
+                             title=f'{granularity} {measure} by {breakdown_label}')
+        fig.update_layout(xaxis_title='Date', yaxis_title='Amount')
+        st.plotly_chart(fig, use_container_width=True)
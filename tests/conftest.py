@@ -0,0 +1,12 @@
+import os
+import sys
+
+# Modules read assets/config.json relative to the working directory and build
+# S3 clients at import time, so tests run from the repository root with dummy
+# credentials (no request is ever sent).
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+os.chdir(ROOT)
+sys.path.insert(0, ROOT)
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "test")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "test")
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
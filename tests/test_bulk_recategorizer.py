@@ -0,0 +1,31 @@
+import pandas as pd
+import pytest
+
+from tabs.bulk_recategorizer import DescriptionIndex, match_transactions
+
+
+def _transactions():
+    return pd.DataFrame(
+        {
+            "Description": ["STARBUCKS #123", "Shell Oil 5541", "starbucks-store", None],
+            "Account_Type": ["Credit", "Credit", "Debit", "Debit"],
+            "Amount": [-4.5, -40.0, -6.25, -1.0],
+            "Transaction_Date": ["2024-01-02", "2024-01-03", "2024-01-04", "2024-01-05"],
+        }
+    )
+
+
+def test_plain_pattern_matches_canonical_descriptions():
+    mask = match_transactions(_transactions(), "starbucks")
+
+    assert mask.tolist() == [True, False, True, False]
+
+
+@pytest.mark.parametrize("pattern", ["*", " - ", "#!"])
+def test_pattern_without_text_is_rejected(pattern):
+    index = DescriptionIndex(_transactions()["Description"])
+
+    with pytest.raises(ValueError):
+        index.match(pattern)
+    with pytest.raises(ValueError):
+        match_transactions(_transactions(), pattern, description_index=index)
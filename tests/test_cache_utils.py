@@ -0,0 +1,21 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from tabs.cache_utils import LRUCache
+
+
+def test_concurrent_puts_keep_size_accounting_consistent():
+    cache = LRUCache(maxsize=16, maxbytes=400, sizeof=len)
+
+    def worker(offset):
+        for number in range(2000):
+            key = (offset + number) % 50
+            cache.put(key, "x" * (key % 40 + 1))
+            cache.get((key * 7) % 50)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(worker, range(0, 400, 50)))
+
+    assert len(cache) <= 16
+    assert set(cache._sizes) == set(cache._entries)
+    assert cache.nbytes == sum(len(value) for value in cache._entries.values())
+    assert cache.nbytes <= 400
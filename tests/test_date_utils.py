@@ -0,0 +1,29 @@
+import pandas as pd
+
+from tabs import date_utils
+from tabs.statement_parser import forget_statement_date_formats, resolve_statement_date_format
+
+FILE_PATH = "data/Checking/2024-01-02_2024-01-31.csv"
+
+
+def test_replaced_file_is_detected_again():
+    day_first = pd.DataFrame({"Transaction_Date": ["13/01/2024", "31/01/2024"]})
+    iso = pd.DataFrame({"Transaction_Date": ["2024-01-13", "2024-01-31"]})
+
+    assert resolve_statement_date_format(day_first, FILE_PATH) == "%d/%m/%Y"
+    # Without invalidation the format of the old file would be reused
+    assert resolve_statement_date_format(iso, FILE_PATH) == "%d/%m/%Y"
+
+    forget_statement_date_formats(FILE_PATH)
+
+    assert resolve_statement_date_format(iso, FILE_PATH) == "%Y-%m-%d"
+    forget_statement_date_formats(FILE_PATH)
+
+
+def test_detected_formats_are_bounded():
+    series = pd.Series(["13/01/2024"])
+    for number in range(date_utils.DETECTED_FORMAT_CACHE_SIZE + 10):
+        date_utils.resolve_date_format(series, cache_key=f"data/Checking/{number}.csv")
+
+    assert len(date_utils._detected_formats) == date_utils.DETECTED_FORMAT_CACHE_SIZE
+    date_utils._detected_formats.clear()
@@ -0,0 +1,32 @@
+import datetime
+
+import numpy as np
+import pandas as pd
+
+from tabs.statement_parser import (
+    TRANSACTION_SORT_ASCENDING,
+    TRANSACTION_SORT_COLUMNS,
+    sort_transactions,
+)
+
+
+def _statement(seed, rows=500):
+    rng = np.random.default_rng(seed)
+    dates = [datetime.date(2024, 1, 1) + datetime.timedelta(days=int(day)) for day in rng.integers(0, 60, rows)]
+    return pd.DataFrame(
+        {
+            "Transaction_Date": dates,
+            "Description": rng.choice(["Coffee", "Grocer", "Rent", None], rows),
+            "Amount": np.where(rng.random(rows) < 0.05, np.nan, rng.integers(-5000, 500, rows) / 100),
+        }
+    )
+
+
+def test_merging_presorted_runs_matches_a_full_sort():
+    runs = pd.concat([sort_transactions(_statement(seed)) for seed in range(5)], ignore_index=True)
+
+    expected = runs.sort_values(
+        by=TRANSACTION_SORT_COLUMNS, ascending=TRANSACTION_SORT_ASCENDING, kind="mergesort"
+    )
+
+    assert sort_transactions(runs).index.tolist() == expected.index.tolist()
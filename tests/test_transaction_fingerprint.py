@@ -0,0 +1,41 @@
+import datetime
+from io import StringIO
+
+import pandas as pd
+
+from tabs.statement_parser import SOURCE_FILE_COLUMN
+from tabs.transaction_fingerprint import (
+    TRANSACTION_ID_COLUMN,
+    assign_transaction_ids,
+    drop_duplicate_transactions,
+)
+
+
+def _consolidated_frame():
+    return pd.DataFrame(
+        {
+            "Transaction_Date": [datetime.date(2024, 1, 2), datetime.date(2024, 1, 2), datetime.date(2024, 1, 20)],
+            "Description": ["Coffee Shop", "Coffee Shop", "Grocer #1"],
+            "Amount": [-1.0, -1.0, -20.0],
+            "Account_Type": ["Chase", "Chase", "Chase"],
+            SOURCE_FILE_COLUMN: ["data/Chase/2024-01-01_2024-01-31.csv"] * 3,
+        }
+    )
+
+
+def test_transaction_ids_survive_csv_round_trip():
+    consolidated_df, _ = drop_duplicate_transactions(_consolidated_frame(), SOURCE_FILE_COLUMN)
+
+    stored_df = pd.read_csv(StringIO(consolidated_df.to_csv(index=False)))
+    recomputed_df = assign_transaction_ids(
+        stored_df.drop(columns=[TRANSACTION_ID_COLUMN]), SOURCE_FILE_COLUMN
+    )
+
+    assert recomputed_df[TRANSACTION_ID_COLUMN].tolist() == consolidated_df[TRANSACTION_ID_COLUMN].tolist()
+    assert stored_df[TRANSACTION_ID_COLUMN].tolist() == consolidated_df[TRANSACTION_ID_COLUMN].tolist()
+
+
+def test_same_day_repeats_keep_distinct_ids():
+    consolidated_df, _ = drop_duplicate_transactions(_consolidated_frame(), SOURCE_FILE_COLUMN)
+
+    assert consolidated_df[TRANSACTION_ID_COLUMN].is_unique
@@ -0,0 +1,52 @@
+import datetime
+from io import StringIO
+
+import pandas as pd
+
+from tabs.statement_parser import SOURCE_FILE_COLUMN
+from tabs.transaction_fingerprint import TRANSACTION_ID_COLUMN, drop_duplicate_transactions
+from tabs.transaction_service import TransactionService
+
+
+def _datasets():
+    consolidated_df, _ = drop_duplicate_transactions(
+        pd.DataFrame(
+            {
+                "Transaction_Date": [datetime.date(2024, 1, 2), datetime.date(2024, 1, 20)],
+                "Post_Date": [datetime.date(2024, 1, 3), datetime.date(2024, 1, 21)],
+                "Description": ["Coffee Shop", "Grocer #1"],
+                "Category": ["Food", "Groceries"],
+                "Amount": [-1.0, -20.0],
+                "Account_Type": ["Chase", "Chase"],
+                SOURCE_FILE_COLUMN: ["data/Chase/2024-01-01_2024-01-31.csv"] * 2,
+            }
+        ),
+        SOURCE_FILE_COLUMN,
+    )
+    stored_df = pd.read_csv(StringIO(consolidated_df.to_csv(index=False)))
+    # An edited dataset saved with IDs from an older hashing of the same rows
+    edited_df = stored_df.assign(**{TRANSACTION_ID_COLUMN: stored_df[TRANSACTION_ID_COLUMN] + 1})
+    return stored_df, edited_df
+
+
+def test_find_new_transactions_ignores_stale_persisted_ids():
+    consolidated_df, edited_df = _datasets()
+
+    new_df = TransactionService().find_new_transactions(consolidated_df, edited_df)
+
+    assert new_df.empty
+
+
+def test_refresh_of_unchanged_dataset_adds_nothing(monkeypatch):
+    consolidated_df, edited_df = _datasets()
+    service = TransactionService()
+    saved = []
+    monkeypatch.setattr(service, "read_csv_from_s3", lambda *args, **kwargs: consolidated_df)
+    monkeypatch.setattr(service, "read_edited_dataset", lambda: edited_df)
+    monkeypatch.setattr(service, "save_edited_dataset", saved.append)
+
+    new_transactions, counts = service.pull_new_transactions()
+
+    assert len(new_transactions) == 0
+    assert counts.sum() == 0
+    assert not saved